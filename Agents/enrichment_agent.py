@@ -3,13 +3,7 @@ import atexit
 import time
 import json
 from dotenv import load_dotenv
-import ollama
-
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from webdriver_manager.chrome import ChromeDriverManager
+from llm_gateway import call_llm
 
 load_dotenv()
 
@@ -18,6 +12,12 @@ _driver_instance = None
 def get_shared_driver():
     global _driver_instance
     if _driver_instance is None:
+        # selenium / webdriver_manager are slow to import; only pay for them when scraping
+        from selenium import webdriver
+        from selenium.webdriver.chrome.service import Service
+        from selenium.webdriver.chrome.options import Options
+        from webdriver_manager.chrome import ChromeDriverManager
+
         print("--- LAUNCHING CHROME ---")
         options = Options()
         options.add_argument("--headless")
@@ -46,6 +46,8 @@ def search_web(query: str):
     Args:
         query: The search string (e.g. 'Dr. Smith NPI registry')
     """
+    from selenium.webdriver.common.by import By
+
     driver = get_shared_driver()
     results_text = ""
     try:
@@ -72,6 +74,8 @@ def scrape_webpage(url: str):
     Args:
         url: The full http url to scrape.
     """
+    from selenium.webdriver.common.by import By
+
     driver = get_shared_driver()
     try:
         print(f"DEBUG: Scraping {url}...")
@@ -140,6 +144,8 @@ class EnrichmentManager:
         """
 
     def enrich_profile(self, partial_profile: dict, missing_keys: list):
+        import ollama
+
         user_query = (
             f"Find missing details for:\n"
             f"Name: {partial_profile.get('first_name')} {partial_profile.get('last_name')}, {partial_profile.get('credential')}\n"
@@ -154,7 +160,9 @@ class EnrichmentManager:
         ]
 
         for _ in range(15):
-            response = ollama.chat(
+            response = call_llm(
+                self.model,
+                ollama.chat,
                 model=self.model,
                 messages=messages,
                 tools=[search_web, scrape_webpage]
@@ -1,16 +1,10 @@
 import os
 import sys
-from pypdf import PdfReader
 from dotenv import load_dotenv
-import pytesseract
-from PIL import Image
-
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_core.prompts import PromptTemplate
-from langchain_core.output_parsers import PydanticOutputParser
 
 # Schema
 from healthcare_schema import HealthcareProviderProfile
+from llm_gateway import call_llm
 
 load_dotenv()
 
@@ -22,14 +16,21 @@ def safe_print(text):
 
 class HealthcareExtractionModel:
     def __init__(self, api_key: str = None):
+        # langchain is slow to import; pay for it when a model is built, not on import
+        from langchain_google_genai import ChatGoogleGenerativeAI
+        from langchain_core.output_parsers import PydanticOutputParser
+
         self.llm = ChatGoogleGenerativeAI(
             model="gemini-2.5-flash",
             temperature=0,
-            google_api_key=api_key or os.getenv("GOOGLE_API_KEY")
+            google_api_key=api_key or os.getenv("GOOGLE_API_KEY"),
+            max_retries=0,  # retries/backoff are handled by llm_gateway
         )
         self.parser = PydanticOutputParser(pydantic_object=HealthcareProviderProfile)
 
     def load_pdf_content(self, pdf_path: str) -> str:
+        from pypdf import PdfReader
+
         try:
             reader = PdfReader(pdf_path)
             full_text = []
@@ -41,13 +42,24 @@ class HealthcareExtractionModel:
             return f"Error reading PDF: {e}"
     
     def load_img_content(self, img_path: str) -> str:
+        import pytesseract
+        from PIL import Image
+
         try:
             img = Image.open(img_path)
             return pytesseract.image_to_string(img)
         except Exception as e:
             return f"Error reading Image: {e}"
 
+    def load_content(self, path: str) -> str:
+        """Text of a PDF, or OCR text of an image."""
+        if path.lower().endswith('.pdf'):
+            return self.load_pdf_content(path)
+        return self.load_img_content(path)
+
     def extract_provider_data(self, raw_text: str):
+        from langchain_core.prompts import PromptTemplate
+
         prompt = PromptTemplate(
             template="""
             You are an expert Healthcare Data Extraction Agent.
@@ -79,22 +91,22 @@ class HealthcareExtractionModel:
 
         try:
             safe_print("--- Analyzing Document for Provider/Organization Data ---")
-            result = chain.invoke({"text_content": raw_text})
+            result = call_llm("gemini-2.5-flash", chain.invoke, {"text_content": raw_text})
             return result
         except Exception as e:
             safe_print(f"Extraction Logic Failed: {e}")
             return None
 
 if __name__ == "__main__":
-    pdf_path = r"C:\Users\mgven\Downloads\Final_Resume.pdf"
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Extract a provider profile from a PDF or image")
+    parser.add_argument("path", help="PDF or image file")
+    args = parser.parse_args()
 
     extractor = HealthcareExtractionModel()
-    
-    if pdf_path.lower().endswith('.pdf'):
-        raw_text = extractor.load_pdf_content(pdf_path)
-    else:
-        raw_text = extractor.load_img_content(pdf_path)
-    
+    raw_text = extractor.load_content(args.path)
+
     structured_data = extractor.extract_provider_data(raw_text)
     
     if structured_data:
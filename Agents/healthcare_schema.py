@@ -2,6 +2,24 @@ from typing import List, Optional, Dict, Any, Literal
 from datetime import date
 from pydantic import BaseModel, Field, field_validator
 
+
+def _is_valid_npi(npi: str) -> bool:
+    """
+    10 digits with a valid Luhn check digit under the 80840 prefix (whose
+    digits always add 24). Kept here, not imported from
+    Validation/npi_checksum.py, so the schema works whatever sys.path holds.
+    """
+    if len(npi) != 10 or not npi.isdigit():
+        return False
+    total = 24
+    for i, d in enumerate(int(c) for c in npi[:9]):
+        if i % 2 == 0:
+            d *= 2
+            d -= 9 if d > 9 else 0
+        total += d
+    return (10 - total % 10) % 10 == int(npi[9])
+
+
 class Address(BaseModel):
     street_address_1: Optional[str] = Field(None, description="Primary street line")
     street_address_2: Optional[str] = Field(None, description="Suite, Unit, or Building")
@@ -81,6 +99,7 @@ class HealthcareProviderProfile(BaseModel):
     def validate_npi(cls, v):
         if not v or v == "null" or v == "":
             return None
-        if len(str(v)) != 10:
+        v = str(v).strip()
+        if not _is_valid_npi(v):
             return None
-        return str(v)
\ No newline at end of file
+        return v
\ No newline at end of file
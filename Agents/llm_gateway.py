@@ -0,0 +1,422 @@
+# llm_gateway.py
+import os
+import time
+import bisect
+import random
+import threading
+from collections import deque
+from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+# HTTP status codes that mean "slow down" vs. "try again"
+OVERLOAD_CODES = {429, 503}
+RETRYABLE_CODES = {429, 500, 502, 503, 504}
+
+
+class LLMCallTimeout(TimeoutError):
+    pass
+
+
+@dataclass
+class ModelConfig:
+    initial_concurrency: float = 4
+    min_concurrency: float = 1
+    max_concurrency: float = 32
+    requests_per_minute: float | None = None  # hard quota, None = unlimited
+    quota_window: float = 60.0                # seconds the quota counts over (shortened in simulate_quota)
+    target_latency: float = 10.0              # seconds; slower successes don't ramp up
+    decrease_cooldown: float = 5.0            # one halving per window, however many 429s land in it
+    call_timeout: float = 120.0
+    max_retries: int = 4
+    backoff_base: float = 1.0
+    backoff_max: float = 30.0
+    hedge: bool = False                       # duplicate slow tail calls
+    hedge_quantile: float = 0.95
+    hedge_min_samples: int = 20
+
+
+# Per-model defaults; override with set_model_config()
+MODEL_CONFIGS = {
+    "gemini-2.5-flash": ModelConfig(
+        initial_concurrency=4,
+        max_concurrency=int(os.getenv("GEMINI_MAX_CONCURRENCY", "32")),
+        requests_per_minute=float(os.getenv("GEMINI_RPM")) if os.getenv("GEMINI_RPM") else None,
+        target_latency=8.0,
+        hedge=True,
+    ),
+    # Local Ollama: hedging would only double the load on the same GPU
+    "llama3.1": ModelConfig(initial_concurrency=1, max_concurrency=4, target_latency=30.0, call_timeout=300.0),
+}
+
+
+def _status_code(exc: Exception):
+    for attr in ("code", "status_code", "status"):
+        value = getattr(exc, attr, None)
+        if isinstance(value, int):
+            return value
+    response = getattr(exc, "response", None)
+    return getattr(response, "status_code", None)
+
+
+def is_overload(exc: Exception) -> bool:
+    """Rate limit / capacity errors and timeouts: back off concurrency."""
+    if isinstance(exc, TimeoutError) or "Timeout" in type(exc).__name__:
+        return True
+    if _status_code(exc) in OVERLOAD_CODES:
+        return True
+    text = str(exc)
+    return "429" in text or "RESOURCE_EXHAUSTED" in text
+
+
+def is_retryable(exc: Exception) -> bool:
+    return is_overload(exc) or _status_code(exc) in RETRYABLE_CODES or isinstance(exc, ConnectionError)
+
+
+class AdaptiveLimiter:
+    """
+    AIMD concurrency limit plus an optional requests-per-minute quota.
+    +1/limit per healthy success (about +1 per round trip), halved on overload
+    at most once per cooldown so a burst of 429s counts as one signal.
+    """
+
+    def __init__(self, config: ModelConfig):
+        self.config = config
+        self.limit = float(config.initial_concurrency)
+        self.in_flight = 0
+        self.cond = threading.Condition()
+        self.last_decrease = 0.0
+        self.quota_times = deque()
+        self.latencies = deque(maxlen=200)
+
+    def _quota_wait(self, now: float) -> float:
+        rpm = self.config.requests_per_minute
+        if not rpm:
+            return 0.0
+        window = self.config.quota_window
+        while self.quota_times and now - self.quota_times[0] >= window:
+            self.quota_times.popleft()
+        if len(self.quota_times) < rpm:
+            return 0.0
+        return window - (now - self.quota_times[0])
+
+    def acquire(self, blocking: bool = True) -> bool:
+        with self.cond:
+            while True:
+                now = time.monotonic()
+                quota_wait = self._quota_wait(now)
+                if self.in_flight < int(self.limit) and quota_wait <= 0:
+                    self.in_flight += 1
+                    self.quota_times.append(now)
+                    return True
+                if not blocking:
+                    return False
+                self.cond.wait(timeout=quota_wait if quota_wait > 0 else None)
+
+    def decrease(self) -> None:
+        with self.cond:
+            now = time.monotonic()
+            if now - self.last_decrease >= self.config.decrease_cooldown:
+                self.limit = max(self.config.min_concurrency, self.limit / 2)
+                self.last_decrease = now
+
+    def release(self, latency: float | None = None, overloaded: bool = False) -> None:
+        with self.cond:
+            self.in_flight -= 1
+            if overloaded:
+                self.decrease()
+            elif latency is not None:
+                self.latencies.append(latency)
+                # Only grow a limit we're actually using, or idle callers inflate it forever
+                if latency <= self.config.target_latency and self.in_flight + 1 >= self.limit / 2:
+                    self.limit = min(self.config.max_concurrency, self.limit + 1.0 / self.limit)
+            self.cond.notify_all()
+
+    def hedge_delay(self) -> float | None:
+        """Latency quantile after which a duplicate request is worth sending."""
+        if len(self.latencies) < self.config.hedge_min_samples:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[int(self.config.hedge_quantile * (len(ordered) - 1))]
+
+
+class LLMGateway:
+    """
+    Single entry point for model calls: gateway.call(model, fn, *args, **kwargs)
+    runs fn under that model's adaptive limit, with jittered retries and
+    (if enabled) a hedged duplicate when the first attempt is in the slow tail.
+    """
+
+    def __init__(self, configs: dict[str, ModelConfig] | None = None, max_workers: int = 128):
+        self.configs = dict(configs or MODEL_CONFIGS)
+        self.limiters = {}
+        self.stats = {}
+        self.lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="llm")
+
+    def set_model_config(self, model: str, config: ModelConfig) -> None:
+        with self.lock:
+            self.configs[model] = config
+            self.limiters.pop(model, None)
+
+    def _limiter(self, model: str) -> AdaptiveLimiter:
+        with self.lock:
+            if model not in self.limiters:
+                self.limiters[model] = AdaptiveLimiter(self.configs.get(model, ModelConfig()))
+                self.stats[model] = {"calls": 0, "retries": 0, "overloads": 0, "hedges": 0, "hedge_wins": 0, "failures": 0}
+            return self.limiters[model]
+
+    def _count(self, model: str, key: str) -> None:
+        with self.lock:
+            self.stats[model][key] += 1
+
+    def _run(self, limiter: AdaptiveLimiter, fn, args, kwargs):
+        """Body of one attempt; runs on the pool and always frees its slot."""
+        start = time.monotonic()
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            limiter.release(overloaded=is_overload(e))
+            raise
+        limiter.release(latency=time.monotonic() - start)
+        return result
+
+    def _attempt(self, model: str, limiter: AdaptiveLimiter, fn, args, kwargs):
+        config = limiter.config
+        limiter.acquire()
+        primary = self.executor.submit(self._run, limiter, fn, args, kwargs)
+        pending = {primary}
+
+        delay = limiter.hedge_delay() if config.hedge else None
+        if delay is not None:
+            done, _ = wait(pending, timeout=delay)
+            # Only hedge when there's spare capacity; never queue behind our own load
+            if not done and limiter.acquire(blocking=False):
+                self._count(model, "hedges")
+                pending.add(self.executor.submit(self._run, limiter, fn, args, kwargs))
+
+        deadline = time.monotonic() + config.call_timeout
+        error = None
+        while pending:
+            done, pending = wait(pending, timeout=max(0.0, deadline - time.monotonic()), return_when=FIRST_COMPLETED)
+            if not done:
+                # Stragglers keep their slot until they really finish
+                raise LLMCallTimeout(f"{model} call exceeded {config.call_timeout}s")
+            for future in done:
+                if future.exception() is None:
+                    if future is not primary:
+                        self._count(model, "hedge_wins")
+                    return future.result()
+                error = future.exception()
+        raise error
+
+    def call(self, model: str, fn, *args, **kwargs):
+        limiter = self._limiter(model)
+        config = limiter.config
+        self._count(model, "calls")
+
+        for attempt in range(config.max_retries + 1):
+            try:
+                return self._attempt(model, limiter, fn, args, kwargs)
+            except Exception as e:
+                if is_overload(e):
+                    self._count(model, "overloads")
+                    if isinstance(e, LLMCallTimeout):
+                        # The stuck call still holds its slot; just shrink the limit
+                        limiter.decrease()
+                if attempt >= config.max_retries or not is_retryable(e):
+                    self._count(model, "failures")
+                    raise
+                self._count(model, "retries")
+                # Full jitter: spread retries so throttled callers don't stampede back together
+                backoff = min(config.backoff_max, config.backoff_base * 2 ** attempt)
+                time.sleep(random.uniform(0, backoff))
+
+    def snapshot(self) -> dict:
+        """Per-model counters and current concurrency limit."""
+        with self.lock:
+            return {
+                model: {**self.stats[model], "limit": round(lim.limit, 2), "in_flight": lim.in_flight}
+                for model, lim in self.limiters.items()
+            }
+
+
+_gateway = None
+_gateway_lock = threading.Lock()
+
+
+def get_gateway() -> LLMGateway:
+    global _gateway
+    with _gateway_lock:
+        if _gateway is None:
+            _gateway = LLMGateway()
+        return _gateway
+
+
+def call_llm(model: str, fn, *args, **kwargs):
+    """Shortcut for get_gateway().call(model, fn, *args, **kwargs)."""
+    return get_gateway().call(model, fn, *args, **kwargs)
+
+
+class SimulatedRateLimit(Exception):
+    code = 429
+
+
+class FakeBackend:
+    """
+    Stand-in for a provider with a hidden concurrency capacity: calls over
+    capacity fail fast with 429, and a slice of calls land in a slow tail.
+    """
+
+    def __init__(self, capacity: int, latency: float = 0.05, tail_rate: float = 0.05, tail_factor: float = 10.0):
+        self.capacity = capacity
+        self.latency = latency
+        self.tail_rate = tail_rate
+        self.tail_factor = tail_factor
+        self.in_flight = 0
+        self.lock = threading.Lock()
+        self.rejected = 0
+        self.started = []
+
+    def __call__(self, prompt: str) -> str:
+        with self.lock:
+            self.started.append(time.monotonic())
+            if self.in_flight >= self.capacity:
+                self.rejected += 1
+                raise SimulatedRateLimit("429 RESOURCE_EXHAUSTED")
+            self.in_flight += 1
+        try:
+            slow = random.random() < self.tail_rate
+            time.sleep(self.latency * (self.tail_factor if slow else 1.0) * random.uniform(0.8, 1.2))
+            return f"ok:{prompt}"
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+
+
+# Bounds simulate() / simulate_quota() hold the gateway to; a run outside them raises
+SIM_LIMIT_RANGE = (0.5, 1.25)   # mean learned limit over the second half, as a fraction of capacity
+SIM_PEAK_LIMIT = 1.5            # highest learned limit, as a fraction of capacity
+SIM_MAX_429_RATE = 0.15         # backend 429s per attempt (calls + retries + hedges)
+
+
+def _check(failures: list[str]) -> None:
+    if failures:
+        raise AssertionError("LLM gateway simulation out of bounds: " + "; ".join(failures))
+
+
+def simulate(n_calls: int = 2000, capacity: int = 12, clients: int = 64, check: bool = True) -> dict:
+    """
+    Drive the gateway against FakeBackend and report throughput and the
+    learned limit. With check, raise AssertionError unless the limit settles
+    near the hidden capacity, 429s stay bounded and every call succeeds.
+    """
+    backend = FakeBackend(capacity)
+    gateway = LLMGateway({
+        "fake": ModelConfig(
+            initial_concurrency=2, max_concurrency=64, target_latency=0.2,
+            decrease_cooldown=0.05, backoff_base=0.01, backoff_max=0.2, max_retries=8,
+            call_timeout=5.0, hedge=True,
+        )
+    })
+    latencies = []
+    limits = []
+    done = threading.Event()
+
+    def client(i):
+        start = time.monotonic()
+        try:
+            gateway.call("fake", backend, str(i))
+        except Exception:
+            return  # counted in the gateway's failures
+        latencies.append(time.monotonic() - start)
+
+    def sample_limit():
+        limiter = gateway._limiter("fake")
+        while not done.wait(0.01):
+            limits.append(limiter.limit)
+
+    sampler = threading.Thread(target=sample_limit, daemon=True)
+    sampler.start()
+    start = time.monotonic()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        list(pool.map(client, range(n_calls)))
+    elapsed = time.monotonic() - start
+    done.set()
+    sampler.join()
+
+    latencies = sorted(latencies) or [0.0]
+    stats = gateway.snapshot()["fake"]
+    settled = limits[len(limits) // 2:] or [stats["limit"]]
+    attempts = stats["calls"] + stats["retries"] + stats["hedges"]
+    result = {
+        "calls_per_sec": round(n_calls / elapsed, 1),
+        "p50_ms": round(latencies[len(latencies) // 2] * 1000, 1),
+        "p99_ms": round(latencies[int(len(latencies) * 0.99)] * 1000, 1),
+        "backend_capacity": capacity,
+        "backend_429s": backend.rejected,
+        "backend_429_rate": round(backend.rejected / attempts, 3),
+        "mean_limit": round(sum(settled) / len(settled), 2),
+        "peak_limit": round(max(limits, default=stats["limit"]), 2),
+        **stats,
+    }
+    print(result)
+
+    if check:
+        low, high = SIM_LIMIT_RANGE
+        failures = []
+        if not low * capacity <= result["mean_limit"] <= high * capacity:
+            failures.append(f"mean limit {result['mean_limit']} not within {low}-{high}x capacity {capacity}")
+        if result["peak_limit"] > SIM_PEAK_LIMIT * capacity:
+            failures.append(f"peak limit {result['peak_limit']} above {SIM_PEAK_LIMIT}x capacity {capacity}")
+        if result["backend_429_rate"] > SIM_MAX_429_RATE:
+            failures.append(f"429 rate {result['backend_429_rate']} above {SIM_MAX_429_RATE}")
+        if result["failures"]:
+            failures.append(f"{result['failures']} calls failed after retries")
+        _check(failures)
+    return result
+
+
+def simulate_quota(rpm: int = 50, window: float = 1.0, n_calls: int = 150, check: bool = True) -> dict:
+    """
+    Run against an unconstrained FakeBackend with a requests_per_minute
+    quota counted over a short window, and check no window saw more than
+    rpm backend calls (hedges and retries included).
+    """
+    backend = FakeBackend(capacity=10_000, latency=0.01)
+    gateway = LLMGateway({
+        "fake": ModelConfig(initial_concurrency=32, max_concurrency=64, requests_per_minute=rpm, quota_window=window)
+    })
+    start = time.monotonic()
+    with ThreadPoolExecutor(max_workers=32) as pool:
+        list(pool.map(lambda i: gateway.call("fake", backend, str(i)), range(n_calls)))
+    elapsed = time.monotonic() - start
+
+    # Calls start a moment after their quota slot is taken, so allow that much slack
+    span = window * 0.95
+    started = sorted(backend.started)
+    busiest = max(bisect.bisect_left(started, t + span) - i for i, t in enumerate(started))
+    result = {
+        "rpm": rpm,
+        "window_s": window,
+        "backend_calls": len(started),
+        "busiest_window": busiest,
+        "seconds": round(elapsed, 2),
+    }
+    print(result)
+
+    if check:
+        _check([f"{busiest} calls in one {window}s window, quota is {rpm}"] if busiest > rpm else [])
+    return result
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Simulate the LLM gateway against a rate-limited fake backend")
+    parser.add_argument("--calls", type=int, default=2000)
+    parser.add_argument("--capacity", type=int, default=12)
+    parser.add_argument("--clients", type=int, default=64)
+    parser.add_argument("--no-check", dest="check", action="store_false", help="report only, don't enforce the bounds")
+    args = parser.parse_args()
+    simulate(args.calls, args.capacity, args.clients, check=args.check)
+    simulate_quota(check=args.check)
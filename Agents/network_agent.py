@@ -1,27 +1,37 @@
-import ollama
-import pandas as pd
-from geopy.distance import geodesic
+import os
+import sys
+from llm_gateway import call_llm
 from typing import List, Dict
 import re
 import json
 
 def load_mock_database():
+    import pandas as pd
+
     providers = [
-        {"id": "P1", "name": "Dr. Smith", "specialty": "Cardiology", "lat": 38.6270, "lon": -90.1994, "city": "St. Louis"},
-        {"id": "P2", "name": "Dr. Jones", "specialty": "Cardiology", "lat": 38.6275, "lon": -90.2000, "city": "St. Louis"},
-        {"id": "P3", "name": "Dr. Ray", "specialty": "Pediatrics", "lat": 38.6500, "lon": -90.3500, "city": "Clayton"},
+        {"id": "P1", "name": "Dr. Smith", "specialty": "Cardiology", "taxonomy_code": "207RC0000X", "lat": 38.6270, "lon": -90.1994, "city": "St. Louis", "panel_capacity": 2},
+        {"id": "P2", "name": "Dr. Jones", "specialty": "Cardiology", "taxonomy_code": "207RI0011X", "lat": 38.6275, "lon": -90.2000, "city": "St. Louis", "panel_capacity": 1},
+        {"id": "P3", "name": "Dr. Ray", "specialty": "Pediatrics", "taxonomy_code": "208000000X", "lat": 38.6500, "lon": -90.3500, "city": "Clayton", "panel_capacity": 3},
     ]
 
     members = [
-        {"id": "M1", "lat": 38.6272, "lon": -90.1990, "needs": ["Cardiology"]}, # Near Downtown
-        {"id": "M2", "lat": 38.7900, "lon": -90.3300, "needs": ["Cardiology"]}, # Florissant (Far North)
-        {"id": "M3", "lat": 38.7950, "lon": -90.3350, "needs": ["Cardiology"]}, # Florissant (Far North)
-        {"id": "M4", "lat": 38.7920, "lon": -90.3320, "needs": ["Cardiology"]}, # Florissant (Far North)
+        {"id": "M1", "lat": 38.6272, "lon": -90.1990, "region": "St. Louis", "needs": ["Cardiology"]}, # Near Downtown
+        {"id": "M2", "lat": 38.7900, "lon": -90.3300, "region": "Florissant", "needs": ["Cardiology"]}, # Florissant (Far North)
+        {"id": "M3", "lat": 38.7950, "lon": -90.3350, "region": "Florissant", "needs": ["Cardiology"]}, # Florissant (Far North)
+        {"id": "M4", "lat": 38.7920, "lon": -90.3320, "region": "Florissant", "needs": ["Cardiology"]}, # Florissant (Far North)
     ]
 
     return pd.DataFrame(providers), pd.DataFrame(members)
 
-df_providers, df_members = load_mock_database()
+_network_data = None
+
+
+def get_network_data():
+    """(providers, members) DataFrames, loaded on first use."""
+    global _network_data
+    if _network_data is None:
+        _network_data = load_mock_database()
+    return _network_data
 
 def parse_action(text):
     match = re.search(r"Action:\s*(\w+)\[(.*)\]", text, re.DOTALL)
@@ -32,20 +42,72 @@ def parse_action(text):
     args = json.loads(match.group(2))
     return fn_name, args
 
-def analyze_specialty_gaps(specialty: str, max_distance_miles: float = 15.0):
+def providers_for_specialty(df_providers, specialty: str):
+    # Resolve the specialty (name or NUCC code) to taxonomy codes and filter by
+    # set membership; fall back to the old substring scan for unknown names.
+    # The crosswalk lives with the validation code (Validation/ on sys.path).
+    from taxonomy_index import get_taxonomy_index
+
+    codes = get_taxonomy_index().resolve(specialty)
+    if codes and 'taxonomy_code' in df_providers:
+        return df_providers[df_providers['taxonomy_code'].isin(codes)]
+    return df_providers[df_providers['specialty'].str.contains(specialty, case=False, na=False)]
+
+def capacity_gaps(specialty: str, max_distance_miles: float = 15.0) -> dict:
+    """
+    Assign members needing `specialty` to in-range providers without
+    exceeding panel_capacity (min-cost flow, see network_assignment.py).
+    Members left over are the real gap, reported by region.
+    """
+    from network_assignment import assign_members
+
+    df_providers, df_members = get_network_data()
+    relevant_providers = providers_for_specialty(df_providers, specialty)
+    relevant_members = df_members[df_members['needs'].apply(lambda x: specialty in x)]
+    if relevant_members.empty:
+        return {"specialty": specialty, "total_demand": 0, "assigned": 0, "unassigned": 0, "unassigned_by_region": {}}
+
+    result = assign_members(relevant_members, relevant_providers, max_distance_miles)
+    return {
+        "specialty": specialty,
+        "total_demand": len(relevant_members),
+        "assigned": result["assigned"],
+        "unassigned": result["unassigned"],
+        "unassigned_by_region": result["unassigned_by_region"],
+    }
+
+def capacity_gap_report(max_distance_miles: float = 15.0, specialties: List[str] = None) -> List[Dict]:
+    """capacity_gaps for every specialty members need (or the given ones)."""
+    _, df_members = get_network_data()
+    if specialties is None:
+        specialties = sorted({s for needs in df_members['needs'] for s in needs})
+    return [capacity_gaps(s, max_distance_miles) for s in specialties]
+
+def analyze_specialty_gaps(specialty: str, max_distance_miles: float = 15.0, capacity_aware: bool = False):
     """
     Analyzes network adequacy for a specific specialty.
     Returns regions where members have 0 access to that specialty within max_distance_miles.
+    With capacity_aware, a member only counts as covered if an in-range
+    provider still has panel capacity for them.
     """
 
     print(f"\nDEBUG: Running Geospatial Analysis for '{specialty}' within {max_distance_miles} miles...")
-    
-    relevant_providers = df_providers[df_providers['specialty'].str.contains(specialty, case=False, na=False)]
+    df_providers, df_members = get_network_data()
+
+    relevant_providers = providers_for_specialty(df_providers, specialty)
     relevant_members = df_members[df_members['needs'].apply(lambda x: specialty in x)]
     
     if relevant_providers.empty:
         return f"CRITICAL: No providers found for {specialty} anywhere in the network."
 
+    if capacity_aware:
+        gaps = capacity_gaps(specialty, max_distance_miles)
+        if not gaps["unassigned"]:
+            return f"Network Adequate: All members can be assigned to a {specialty} provider with panel capacity within {max_distance_miles} miles."
+        return json.dumps({"status": "CAPACITY_GAP_DETECTED", **gaps}, indent = 2)
+
+    from geopy.distance import geodesic
+
     gaps = []
     
     for _, member in relevant_members.iterrows():
@@ -89,6 +151,7 @@ REACT_SYSTEM_PROMPT = """
 
         Thought: Your reasoning
         Action: analyze_specialty_gaps[JSON arguments]
+                (arguments: specialty, max_distance_miles, capacity_aware)
         Observation: Tool result
         Thought: Interpretation
         Final Answer: Professional summary with recommendation
@@ -107,10 +170,14 @@ class ReActNetworkGapAgent:
         ]
 
     def run(self, user_query):
+        import ollama
+
         self.messages.append({"role": "user", "content": user_query})
 
         while True:
-            response = ollama.chat(
+            response = call_llm(
+                self.model,
+                ollama.chat,
                 model=self.model,
                 messages=self.messages
             )
@@ -137,5 +204,9 @@ class ReActNetworkGapAgent:
                 raise ValueError("Invalid or missing action")
 
 if __name__ == "__main__":
+    # Run directly: make the sibling Validation/ folder importable (cli.py does this for its commands)
+    sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Backend"))
+    from repo_paths import add_repo_dir
+    add_repo_dir("Validation")
     agent = ReActNetworkGapAgent()
     agent.run("Analyze the network for Cardiology gaps. Are our members covered?")
\ No newline at end of file
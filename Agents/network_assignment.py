@@ -0,0 +1,162 @@
+# network_assignment.py
+import numpy as np
+import pandas as pd
+from scipy.spatial import cKDTree
+from scipy.sparse import coo_matrix
+from scipy.optimize import linprog
+
+EARTH_RADIUS_MILES = 3958.8
+DEFAULT_PANEL_CAPACITY = 2000   # members per provider when no panel_capacity is given
+# Cost of leaving one member unassigned. Far above any real travel cost, so
+# the solver first maximizes assigned members, then minimizes total distance.
+UNASSIGNED_PENALTY_MILES = 1e6
+
+
+def _unit_vectors(lat, lon) -> np.ndarray:
+    lat = np.radians(np.asarray(lat, dtype=float))
+    lon = np.radians(np.asarray(lon, dtype=float))
+    return np.column_stack([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)])
+
+
+def candidate_arcs(member_lat, member_lon, provider_lat, provider_lon, max_distance_miles: float):
+    """
+    Sparse (member, provider, miles) pairs within max_distance_miles, found
+    with a k-d tree radius search on unit-sphere coordinates instead of a
+    full members x providers distance matrix. Distances are great-circle
+    (spherical earth), within ~0.5% of geodesic.
+    """
+    members = _unit_vectors(member_lat, member_lon)
+    providers = _unit_vectors(provider_lat, provider_lon)
+    if not len(members) or not len(providers):
+        empty = np.array([], dtype=np.int64)
+        return empty, empty, np.array([], dtype=float)
+
+    # Chord length on the unit sphere for the radius, then back to arc miles
+    max_chord = 2 * np.sin(min(max_distance_miles / EARTH_RADIUS_MILES, np.pi) / 2)
+    pairs = cKDTree(members).sparse_distance_matrix(cKDTree(providers), max_chord, output_type="ndarray")
+    miles = 2 * EARTH_RADIUS_MILES * np.arcsin(np.clip(pairs["v"] / 2, 0, 1))
+    return pairs["i"].astype(np.int64), pairs["j"].astype(np.int64), miles
+
+
+def min_cost_assignment(demand, capacity, arc_member, arc_provider, arc_cost):
+    """
+    Min-cost flow from member groups (supply = demand) to providers
+    (capacity) over the candidate arcs, with an overflow arc per group at
+    UNASSIGNED_PENALTY_MILES so the problem is always feasible.
+
+    Solved as its LP (one flow variable per arc) with HiGHS interior point
+    plus crossover, ~10x faster than its simplex on these problems. The
+    node-arc constraint matrix is totally unimodular, so the crossover
+    vertex is integral.
+    Returns (arc_flow, unassigned_per_group).
+    """
+    demand = np.asarray(demand, dtype=float)
+    capacity = np.asarray(capacity, dtype=float)
+    n_groups, n_arcs = len(demand), len(arc_member)
+
+    # Variables: [arc flows..., unassigned per group...]
+    cost = np.concatenate([np.asarray(arc_cost, dtype=float), np.full(n_groups, UNASSIGNED_PENALTY_MILES)])
+
+    # Flow conservation at each member group: assigned + unassigned == demand
+    rows = np.concatenate([arc_member, np.arange(n_groups)])
+    cols = np.arange(n_arcs + n_groups)
+    a_eq = coo_matrix((np.ones(len(cols)), (rows, cols)), shape=(n_groups, n_arcs + n_groups)).tocsr()
+
+    # Panel capacity at each provider
+    a_ub = coo_matrix(
+        (np.ones(n_arcs), (arc_provider, np.arange(n_arcs))),
+        shape=(len(capacity), n_arcs + n_groups),
+    ).tocsr()
+
+    result = linprog(cost, A_ub=a_ub, b_ub=capacity, A_eq=a_eq, b_eq=demand, bounds=(0, None), method="highs-ipm")
+    if result.status != 0:
+        raise RuntimeError(f"Assignment solve failed: {result.message}")
+    flow = np.rint(result.x).astype(np.int64)
+    return flow[:n_arcs], flow[n_arcs:]
+
+
+def assign_members(
+    members: pd.DataFrame,
+    providers: pd.DataFrame,
+    max_distance_miles: float,
+    default_capacity: int = DEFAULT_PANEL_CAPACITY,
+) -> dict:
+    """
+    Capacity-aware assignment of members to providers within
+    max_distance_miles. Members at the same location and region are solved
+    as one group, so a membership geocoded to ZIP centroids stays small.
+
+    members:   lat, lon, optional region (missing ones fall back to the grid)
+    providers: id, lat, lon, optional panel_capacity
+    Returns {"assignments": DataFrame(region, provider_id, members, miles),
+             "unassigned_by_region": {region: count}, "assigned", "unassigned"}.
+    """
+    members = members.copy()
+    # Members without a region are reported on a ~7 mile grid; groupby would
+    # otherwise drop rows with a missing key and lose their demand
+    grid = members["lat"].round(1).astype(str) + "," + members["lon"].round(1).astype(str)
+    members["region"] = members["region"].fillna(grid) if "region" in members else grid
+    groups = members.groupby(["lat", "lon", "region"], sort=False).size().reset_index(name="demand")
+
+    if "panel_capacity" in providers:
+        capacity = providers["panel_capacity"].fillna(default_capacity).to_numpy()
+    else:
+        capacity = np.full(len(providers), default_capacity)
+
+    arc_member, arc_provider, miles = candidate_arcs(
+        groups["lat"], groups["lon"], providers["lat"], providers["lon"], max_distance_miles
+    )
+    flow, unassigned = min_cost_assignment(groups["demand"], capacity, arc_member, arc_provider, miles)
+
+    used = flow > 0
+    assignments = pd.DataFrame({
+        "region": groups["region"].to_numpy()[arc_member[used]],
+        "provider_id": providers["id"].to_numpy()[arc_provider[used]],
+        "members": flow[used],
+        "miles": np.round(miles[used], 2),
+    })
+    by_region = pd.Series(unassigned, index=groups["region"]).groupby(level=0).sum()
+    return {
+        "assignments": assignments,
+        "unassigned_by_region": {region: int(n) for region, n in by_region.items() if n > 0},
+        "assigned": int(flow.sum()),
+        "unassigned": int(unassigned.sum()),
+    }
+
+
+def synthetic_network(n_members: int, n_providers: int, seed: int = 0):
+    """Members geocoded to a ~0.7 mile grid over the St. Louis area, providers scattered with random panels."""
+    rng = np.random.default_rng(seed)
+    members = pd.DataFrame({
+        "lat": np.round(rng.uniform(38.3, 39.0, n_members), 2),
+        "lon": np.round(rng.uniform(-90.8, -89.9, n_members), 2),
+    })
+    members["region"] = "R" + (members["lat"] * 10).astype(int).astype(str)
+    providers = pd.DataFrame({
+        "id": [f"P{i}" for i in range(n_providers)],
+        "lat": rng.uniform(38.3, 39.0, n_providers),
+        "lon": rng.uniform(-90.8, -89.9, n_providers),
+        "panel_capacity": rng.integers(20, 150, n_providers),
+    })
+    return members, providers
+
+
+def benchmark(sizes=(10_000, 50_000, 200_000), providers_per_member: float = 0.01, max_distance_miles: float = 5.0) -> None:
+    import time
+
+    print(f"{'members':>9} {'providers':>10} {'seconds':>8} {'unassigned':>11}")
+    for n in sizes:
+        members, providers = synthetic_network(n, max(1, int(n * providers_per_member)))
+        start = time.perf_counter()
+        result = assign_members(members, providers, max_distance_miles)
+        print(f"{n:>9} {len(providers):>10} {time.perf_counter() - start:>8.2f} {result['unassigned']:>11}")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark capacity-aware member assignment on synthetic data")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 50_000, 200_000])
+    parser.add_argument("--radius", type=float, default=5.0)
+    args = parser.parse_args()
+    benchmark(tuple(args.sizes), max_distance_miles=args.radius)
@@ -0,0 +1,386 @@
+# bulk_loader.py
+import csv
+import json
+import time
+import asyncio
+from datetime import datetime
+
+from sqlalchemy import func, select, text
+from sqlalchemy.dialects import postgresql, sqlite
+
+from database import engine as default_engine
+from db_metrics import db_metrics
+from models import Provider
+
+PROVIDER_TABLE = Provider.__table__
+
+# Columns we write on every upsert (provider_id / created_at are left to the DB)
+UPSERT_COLUMNS = [
+    c.name for c in PROVIDER_TABLE.columns
+    if c.name not in ("provider_id", "created_at")
+]
+
+# Row key for column values written only when the NPI is new (see _apply_insert_only)
+INSERT_ONLY_KEY = "_insert_only"
+
+# Validate.py taxonomy_specialty_match verdict -> taxonomy_status
+CROSSWALK_STATUS = {"match": "verified", "related": "related", "mismatch": "mismatch"}
+
+
+def _to_bool(value):
+    if isinstance(value, bool):
+        return value
+    value = str(value).strip().lower() if value is not None else ""
+    if not value:
+        return None
+    return value in ("true", "1", "yes", "y")
+
+
+def _match_status(value):
+    match = _to_bool(value)
+    if match is None:
+        return None
+    return "verified" if match else "mismatch"
+
+
+def profile_to_provider_row(profile) -> dict:
+    """
+    Map a HealthcareProviderProfile (or its model_dump() dict) to a
+    providers_master row dict keyed by column name.
+
+    status / overall_confidence / last_verified belong to validation, so
+    they are only filled in for NPIs not yet in the table; an extraction
+    load leaves an existing row's validation metadata alone.
+    """
+    data = profile.model_dump(mode="json") if hasattr(profile, "model_dump") else dict(profile)
+
+    locations = data.get("locations") or []
+    practice = next(
+        (loc for loc in locations if loc.get("address_type") == "Practice"),
+        locations[0] if locations else {},
+    )
+    licenses = data.get("licenses") or []
+    taxonomy_codes = data.get("taxonomy_codes") or []
+
+    if data.get("provider_type") == "Organization" and data.get("organization_name"):
+        display_name = data.get("organization_name")
+    else:
+        display_name = " ".join(
+            p for p in (data.get("first_name"), data.get("last_name")) if p
+        ) or data.get("organization_name")
+
+    now = datetime.utcnow()
+    verified_date = data.get("last_verified_date")
+
+    row = {c: None for c in UPSERT_COLUMNS}
+    row.update({
+        "npi": data.get("npi") or None,
+        "display_name": display_name,
+        "first_name": data.get("first_name"),
+        "last_name": data.get("last_name"),
+        "taxonomy_code": taxonomy_codes[0] if taxonomy_codes else None,
+        "specialties": data.get("specialties") or None,
+        "license_number": licenses[0].get("license_number") if licenses else None,
+        "phone": practice.get("phone"),
+        "email": data.get("primary_email"),
+        "website": data.get("website_url"),
+        "practice_name": data.get("organization_name"),
+        "address_line1": practice.get("street_address_1"),
+        "city": practice.get("city"),
+        "state": practice.get("state"),
+        "postal_code": practice.get("zip_code"),
+        "accepting_new_patients": data.get("accepting_new_patients"),
+        "telehealth": data.get("offers_telehealth"),
+        "languages": data.get("languages_spoken") or None,
+        "updated_at": now,
+        "raw_data_json": data,
+        INSERT_ONLY_KEY: {
+            "last_verified": datetime.fromisoformat(verified_date) if verified_date else now,
+            "overall_confidence": data.get("data_confidence_score"),
+            "status": "needs_review",
+        },
+    })
+    return row
+
+
+def validation_row_to_provider_row(row: dict) -> dict:
+    """
+    Map one output row of validate_csv_with_gemini (short or long header
+    layout, see row_projection.SOURCE_FIELDS) to a providers_master row
+    dict, including the per-attribute *_status / *_confidence fields.
+    """
+    # Validation/ must be importable (added by the entry points)
+    from row_projection import SOURCE_FIELDS, clean_value, project_row
+
+    src = project_row(row, SOURCE_FIELDS)
+
+    lookup_ok = _to_bool(row.get("npi_lookup_success"))
+    overall_match = _to_bool(row.get("gemini_overall_match"))
+
+    confidence = clean_value(row.get("gemini_confidence"))
+    confidence = float(confidence) / 100.0 if confidence is not None else None
+
+    if lookup_ok is False or clean_value(row.get("prevalidation_status")) == "rejected":
+        status = "rejected"
+    elif overall_match:
+        status = "verified"
+    else:
+        status = "needs_review"
+
+    is_org = src.get("entity_type") == "O"
+    first_name = src.get("first_name")
+    last_name = src.get("last_name")
+    specialty = src.get("specialty")
+
+    name_status = _match_status(row.get("gemini_name_match"))
+    address_status = _match_status(row.get("gemini_address_match"))
+    taxonomy_status = _match_status(row.get("gemini_specialty_match"))
+    taxonomy_confidence = confidence if taxonomy_status else None
+    # Prefer the deterministic NUCC crosswalk verdict over the LLM's when it has one
+    crosswalk = clean_value(row.get("taxonomy_specialty_match"))
+    if crosswalk in CROSSWALK_STATUS:
+        taxonomy_status = CROSSWALK_STATUS[crosswalk]
+        taxonomy_confidence = 1.0
+
+    now = datetime.utcnow()
+
+    out = {c: None for c in UPSERT_COLUMNS}
+    out.update({
+        "npi": src.get("npi"),
+        "display_name": last_name if is_org else " ".join(p for p in (first_name, last_name) if p) or None,
+        "first_name": None if is_org else first_name,
+        "last_name": None if is_org else last_name,
+        "specialties": [specialty] if specialty else None,
+        "practice_name": last_name if is_org else None,
+        "address_line1": src.get("address_1"),
+        "city": src.get("city"),
+        "state": src.get("state"),
+        "postal_code": src.get("postal_code"),
+        "country": src.get("country"),
+        "last_verified": now,
+        "overall_confidence": confidence,
+        "status": status,
+        "nppes_last_updated": clean_value(row.get("npi_last_updated")),
+        "updated_at": now,
+        "raw_data_json": row,
+        "npi_status": None if lookup_ok is None else ("verified" if lookup_ok else "not_found"),
+        "npi_confidence": None if lookup_ok is None else (1.0 if lookup_ok else 0.0),
+        "name_status": name_status,
+        "name_confidence": confidence if name_status else None,
+        "address_status": address_status,
+        "address_confidence": confidence if address_status else None,
+        "taxonomy_status": taxonomy_status,
+        "taxonomy_confidence": taxonomy_confidence,
+    })
+    return out
+
+
+def _dedupe_by_npi(rows: list[dict]) -> list[dict]:
+    # ON CONFLICT cannot touch the same row twice in one statement; last one wins
+    by_npi = {}
+    for r in rows:
+        if r.get("npi"):
+            by_npi[r["npi"]] = r
+    return list(by_npi.values())
+
+
+async def _apply_insert_only(conn, rows: list[dict]) -> None:
+    """
+    Resolve each row's INSERT_ONLY_KEY values: used as-is for a new NPI,
+    replaced by the stored values when the NPI is already in the table.
+    (They can't just be left NULL for COALESCE: status and last_verified
+    are NOT NULL, which is checked before ON CONFLICT.)
+    """
+    pending = [r for r in rows if r.get(INSERT_ONLY_KEY)]
+    if pending:
+        columns = sorted({c for r in pending for c in r[INSERT_ONLY_KEY]})
+        result = await conn.execute(
+            select(PROVIDER_TABLE.c.npi, *(PROVIDER_TABLE.c[c] for c in columns))
+            .where(PROVIDER_TABLE.c.npi.in_([r["npi"] for r in pending]))
+        )
+        existing = {row.npi: row._mapping for row in result}
+        for r in pending:
+            stored = existing.get(r["npi"])
+            r.update({c: stored[c] for c in r[INSERT_ONLY_KEY]} if stored else r[INSERT_ONLY_KEY])
+    for r in rows:
+        r.pop(INSERT_ONLY_KEY, None)
+
+
+def _upsert_statement(dialect_name: str):
+    dialect = postgresql if dialect_name == "postgresql" else sqlite
+    stmt = dialect.insert(PROVIDER_TABLE)
+    # COALESCE keeps existing values when the incoming source didn't have them,
+    # so an extraction load doesn't wipe validation metadata and vice versa.
+    set_ = {
+        c: func.coalesce(stmt.excluded[c], PROVIDER_TABLE.c[c])
+        for c in UPSERT_COLUMNS if c != "npi"
+    }
+    return stmt.on_conflict_do_update(index_elements=["npi"], set_=set_)
+
+
+async def _upsert_batch_insert(conn, rows: list[dict]) -> None:
+    stmt = _upsert_statement(conn.dialect.name)
+    await conn.execute(stmt, rows)
+
+
+async def _upsert_batch_copy(conn, rows: list[dict]) -> None:
+    """COPY into a temp staging table, then one INSERT ... SELECT ON CONFLICT."""
+    await conn.exec_driver_sql(
+        "CREATE TEMP TABLE IF NOT EXISTS providers_staging "
+        "(LIKE providers_master INCLUDING DEFAULTS) ON COMMIT DELETE ROWS"
+    )
+
+    raw = await conn.get_raw_connection()
+    records = [
+        tuple(
+            json.dumps(r[c]) if c == "raw_data_json" and r[c] is not None else r[c]
+            for c in UPSERT_COLUMNS
+        )
+        for r in rows
+    ]
+    # Driver-level COPY bypasses the cursor events; time it explicitly
+    with db_metrics.timed("COPY providers_staging"):
+        await raw.driver_connection.copy_records_to_table(
+            "providers_staging", records=records, columns=UPSERT_COLUMNS
+        )
+
+    cols = ", ".join(UPSERT_COLUMNS)
+    updates = ", ".join(
+        f"{c} = COALESCE(EXCLUDED.{c}, providers_master.{c})"
+        for c in UPSERT_COLUMNS if c != "npi"
+    )
+    await conn.execute(text(
+        f"INSERT INTO providers_master ({cols}) "
+        f"SELECT {cols} FROM providers_staging "
+        f"ON CONFLICT (npi) DO UPDATE SET {updates}"
+    ))
+
+
+async def bulk_upsert_providers(
+    rows,
+    batch_size: int = 5000,
+    method: str = "auto",
+    engine=None,
+) -> dict:
+    """
+    Upsert an iterable of providers_master row dicts on npi, in batches.
+
+    method:
+      "insert" - multi-row INSERT ... ON CONFLICT (Postgres or SQLite)
+      "copy"   - asyncpg COPY into a staging table, then merge (Postgres only)
+      "auto"   - "copy" on Postgres, "insert" otherwise
+    Returns {"rows": n, "batches": n, "seconds": s, "rows_per_sec": r}.
+    """
+    engine = engine or default_engine
+    if method == "auto":
+        method = "copy" if engine.dialect.name == "postgresql" else "insert"
+    if method == "copy" and engine.dialect.name != "postgresql":
+        raise ValueError("method='copy' requires a PostgreSQL (asyncpg) engine")
+    upsert_batch = _upsert_batch_copy if method == "copy" else _upsert_batch_insert
+
+    total = 0
+    batches = 0
+    start = time.perf_counter()
+
+    async def flush(batch):
+        nonlocal total, batches
+        batch = _dedupe_by_npi(batch)
+        if not batch:
+            return
+        async with engine.begin() as conn:
+            await _apply_insert_only(conn, batch)
+            await upsert_batch(conn, batch)
+        total += len(batch)
+        batches += 1
+        elapsed = time.perf_counter() - start
+        print(f"[batch {batches}] {total} rows upserted ({total / elapsed:,.0f} rows/sec)")
+
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            await flush(batch)
+            batch = []
+    await flush(batch)
+
+    elapsed = time.perf_counter() - start
+    stats = {
+        "rows": total,
+        "batches": batches,
+        "seconds": round(elapsed, 3),
+        "rows_per_sec": round(total / elapsed, 1) if elapsed > 0 else 0.0,
+    }
+    print(f"✓ Upserted {total} rows in {elapsed:.1f}s ({stats['rows_per_sec']:,.0f} rows/sec, method={method})")
+    return stats
+
+
+async def load_validation_csv(csv_path: str, **kwargs) -> dict:
+    """Stream a validate_csv_with_gemini output file into providers_master."""
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        # Rows whose NPI failed the check digit have nothing to key on
+        rows = (
+            validation_row_to_provider_row(r) for r in reader
+            if "invalid_npi" not in (r.get("prevalidation_reasons") or "")
+        )
+        return await bulk_upsert_providers(rows, **kwargs)
+
+
+async def load_profiles(profiles, **kwargs) -> dict:
+    """Upsert HealthcareProviderProfile objects produced by the extractor."""
+    rows = (profile_to_provider_row(p) for p in profiles)
+    return await bulk_upsert_providers(rows, **kwargs)
+
+
+def synthetic_validation_rows(n: int):
+    """Generate n fake validator rows (short layout) for load benchmarking."""
+    states = ["MO", "NC", "KS", "IL", "TX", "CA", "NY", "FL"]
+    specialties = ["Internal Medicine", "Cardiology", "Pediatrics", "Family Practice"]
+    for i in range(n):
+        yield {
+            "npi": str(1000000000 + i),
+            "lname": f"LAST{i % 50000}",
+            "fname": f"FIRST{i % 997}",
+            "etype": "I",
+            "addr1": f"{i % 9999} MAIN ST",
+            "city": "SAINT LOUIS",
+            "zip": f"{63000 + i % 1000}0000.0",
+            "state": states[i % len(states)],
+            "country": "US",
+            # Independent of state (i % 8), so every state has every specialty
+            "ptype": specialties[i // len(states) % len(specialties)],
+            "npi_lookup_success": "True",
+            "gemini_overall_match": "True" if i % 3 else "False",
+            "gemini_confidence": str(i % 101),
+            "gemini_name_match": "True",
+            "gemini_address_match": "True" if i % 2 else "False",
+            "gemini_specialty_match": "True",
+        }
+
+
+if __name__ == "__main__":
+    import argparse
+    from database import init_db
+    from repo_paths import add_repo_dir
+
+    add_repo_dir("Validation")  # row_projection maps the CSV headers
+
+    parser = argparse.ArgumentParser(description="Bulk upsert validation results into providers_master")
+    parser.add_argument("csv_path", nargs="?", help="validate_csv_with_gemini output CSV")
+    parser.add_argument("--synthetic", type=int, default=0, help="load N synthetic rows instead of a CSV")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--method", choices=["auto", "insert", "copy"], default="auto")
+    args = parser.parse_args()
+
+    async def main():
+        await init_db()
+        if args.synthetic:
+            rows = (validation_row_to_provider_row(r) for r in synthetic_validation_rows(args.synthetic))
+            await bulk_upsert_providers(rows, batch_size=args.batch_size, method=args.method)
+        elif args.csv_path:
+            await load_validation_csv(args.csv_path, batch_size=args.batch_size, method=args.method)
+        else:
+            parser.error("pass a CSV path or --synthetic N")
+        db_metrics.report()
+
+    asyncio.run(main())
@@ -0,0 +1,235 @@
+# db_metrics.py
+import re
+import time
+import bisect
+import hashlib
+import threading
+from collections import deque
+from contextlib import contextmanager
+
+from sqlalchemy import event
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+# Histogram bucket upper bounds in ms; the last bucket is open-ended
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, float("inf"))
+MAX_STATEMENTS = 200          # distinct statement shapes tracked; the rest land in "<other>"
+SLOW_LOG_INTERVAL = 10.0      # seconds between slow-query log lines for the same statement shape
+RECENT_SLOW_QUERIES = 50
+
+_PLACEHOLDER_RE = re.compile(r"\$\d+|%\(\w+\)s|(?<![:\w]):\w+|\?")
+_LITERAL_RE = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_REPEATED_ROW_RE = re.compile(r"(\(\?(?:, \?)*\))(?:, \(\?(?:, \?)*\))+")
+_IN_LIST_RE = re.compile(r"IN \(\?(?:, \?)+\)", re.IGNORECASE)
+
+
+def statement_shape(sql: str) -> str:
+    """
+    Normalize SQL so executions that differ only in values share one key:
+    literals and driver placeholders become ?, multi-row VALUES lists and
+    IN lists collapse, whitespace is squeezed.
+    """
+    sql = " ".join(sql.split())
+    sql = _PLACEHOLDER_RE.sub("?", sql)
+    sql = _LITERAL_RE.sub("?", sql)
+    sql = _REPEATED_ROW_RE.sub(r"\1, ...", sql)
+    return _IN_LIST_RE.sub("IN (?, ...)", sql)
+
+
+def parameter_fingerprint(parameters, executemany: bool = False) -> str:
+    """
+    Shape of the bound parameters (names, types, row count) plus a short
+    hash of it. Values are never included: they can be provider PHI.
+    """
+    if executemany and isinstance(parameters, (list, tuple)) and parameters:
+        shape = f"{len(parameters)} rows x {parameter_fingerprint(parameters[0]).split(' #')[0]}"
+    elif isinstance(parameters, dict):
+        shape = "{" + ", ".join(f"{k}:{type(v).__name__}" for k, v in sorted(parameters.items())) + "}"
+    elif isinstance(parameters, (list, tuple)):
+        types = [type(v).__name__ for v in parameters]
+        shape = f"({len(types)} params: {', '.join(sorted(set(types)))})" if types else "()"
+    else:
+        shape = type(parameters).__name__
+    return f"{shape} #{hashlib.sha1(shape.encode()).hexdigest()[:8]}"
+
+
+class LatencyHistogram:
+    def __init__(self):
+        self.buckets = [0] * len(LATENCY_BUCKETS_MS)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, ms: float) -> None:
+        self.buckets[bisect.bisect_left(LATENCY_BUCKETS_MS, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def quantile(self, q: float) -> float | None:
+        """Upper bound of the bucket holding the q-th observation (capped at max)."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, n in zip(LATENCY_BUCKETS_MS, self.buckets):
+            seen += n
+            if seen >= rank:
+                return round(min(bound, self.max_ms), 2)
+        return round(self.max_ms, 2)
+
+    def summary(self) -> dict:
+        return {
+            "count": self.count,
+            "total_ms": round(self.total_ms, 1),
+            "mean_ms": round(self.total_ms / self.count, 2) if self.count else None,
+            "p50_ms": self.quantile(0.50),
+            "p95_ms": self.quantile(0.95),
+            "p99_ms": self.quantile(0.99),
+            "max_ms": round(self.max_ms, 2),
+            "buckets": {
+                ("+inf" if b == float("inf") else f"le_{b}"): n
+                for b, n in zip(LATENCY_BUCKETS_MS, self.buckets) if n
+            },
+        }
+
+
+class DBMetrics:
+    """
+    Per-statement-shape latency histograms, pool checkout waits and a
+    rate-limited slow-query log, fed by instrument_engine() and
+    TimedAsyncQueuePool. Shared across threads.
+    """
+
+    def __init__(self, slow_query_ms: float = 200.0):
+        self.slow_query_ms = slow_query_ms
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self.lock:
+            self.statements = {}
+            self.errors = {}
+            self.pool_wait = LatencyHistogram()
+            self.pool_timeouts = 0
+            self.slow_queries = deque(maxlen=RECENT_SLOW_QUERIES)
+            self.slow_last_logged = {}
+            self.slow_suppressed = {}
+
+    def _key(self, shape: str) -> str:
+        if shape in self.statements or len(self.statements) < MAX_STATEMENTS:
+            return shape
+        return "<other>"
+
+    def record(self, sql: str, ms: float, parameters=None, executemany: bool = False) -> None:
+        shape = statement_shape(sql)
+        with self.lock:
+            key = self._key(shape)
+            self.statements.setdefault(key, LatencyHistogram()).observe(ms)
+        if ms >= self.slow_query_ms:
+            self._slow(shape, ms, parameter_fingerprint(parameters, executemany))
+
+    def record_error(self, sql: str) -> None:
+        with self.lock:
+            key = self._key(statement_shape(sql))
+            self.errors[key] = self.errors.get(key, 0) + 1
+
+    def record_pool_wait(self, ms: float, timed_out: bool = False) -> None:
+        with self.lock:
+            self.pool_wait.observe(ms)
+            if timed_out:
+                self.pool_timeouts += 1
+
+    def _slow(self, shape: str, ms: float, params: str) -> None:
+        now = time.monotonic()
+        with self.lock:
+            self.slow_queries.append({"ms": round(ms, 1), "statement": shape[:500], "params": params, "at": time.time()})
+            # One line per statement shape per interval, so a slow bulk load doesn't flood the log
+            if now - self.slow_last_logged.get(shape, -SLOW_LOG_INTERVAL) < SLOW_LOG_INTERVAL:
+                self.slow_suppressed[shape] = self.slow_suppressed.get(shape, 0) + 1
+                return
+            self.slow_last_logged[shape] = now
+            suppressed = self.slow_suppressed.pop(shape, 0)
+        more = f" (+{suppressed} more since last report)" if suppressed else ""
+        print(f"[SLOW SQL] {ms:.0f} ms{more} params={params} :: {shape[:300]}")
+
+    @contextmanager
+    def timed(self, label: str):
+        """Time driver-level work the cursor events can't see (e.g. asyncpg COPY)."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(label, (time.perf_counter() - start) * 1000)
+
+    def snapshot(self, engine=None, top: int = 20) -> dict:
+        """Top statements by total time, pool waits and recent slow queries."""
+        with self.lock:
+            ranked = sorted(self.statements.items(), key=lambda kv: kv[1].total_ms, reverse=True)
+            statements = [
+                {"statement": shape[:500], **hist.summary(), "errors": self.errors.get(shape, 0)}
+                for shape, hist in ranked[:top]
+            ]
+            out = {
+                "slow_query_ms": self.slow_query_ms,
+                "statement_shapes": len(self.statements),
+                "statements": statements,
+                "pool_wait": {**self.pool_wait.summary(), "timeouts": self.pool_timeouts},
+                "slow_queries": list(self.slow_queries)[-10:],
+            }
+        if engine is not None:
+            pool = engine.sync_engine.pool if hasattr(engine, "sync_engine") else engine.pool
+            out["pool"] = {"class": type(pool).__name__, "status": pool.status()}
+        return out
+
+    def report(self, top: int = 10) -> None:
+        """Print where DB time went, largest total first."""
+        snap = self.snapshot(top=top)
+        print(f"{'total ms':>10} {'count':>7} {'p50':>7} {'p95':>7} {'max':>8}  statement")
+        for s in snap["statements"]:
+            print(
+                f"{s['total_ms']:>10.0f} {s['count']:>7} {s['p50_ms'] or 0:>7.1f} "
+                f"{s['p95_ms'] or 0:>7.1f} {s['max_ms']:>8.1f}  {s['statement'][:100]}"
+            )
+        wait = snap["pool_wait"]
+        if wait["count"]:
+            print(f"Pool checkout wait: p50 {wait['p50_ms']} ms, p99 {wait['p99_ms']} ms, "
+                  f"max {wait['max_ms']} ms over {wait['count']} checkouts, {wait['timeouts']} timeouts")
+
+
+db_metrics = DBMetrics()
+
+
+class TimedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool that records how long each checkout waited for a connection."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except Exception:
+            db_metrics.record_pool_wait((time.perf_counter() - start) * 1000, timed_out=True)
+            raise
+        db_metrics.record_pool_wait((time.perf_counter() - start) * 1000)
+        return conn
+
+
+def instrument_engine(engine, metrics: DBMetrics = db_metrics) -> None:
+    """Attach per-statement timing hooks to an (async) engine."""
+    sync_engine = getattr(engine, "sync_engine", engine)
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        start = conn.info["query_start"].pop()
+        metrics.record(statement, (time.perf_counter() - start) * 1000, parameters, executemany)
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _error(exception_context):
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("query_start"):
+            conn.info["query_start"].pop()
+        if exception_context.statement:
+            metrics.record_error(exception_context.statement)
@@ -0,0 +1,303 @@
+# dedupe_providers.py
+import re
+import time
+import random
+import asyncio
+
+import numpy as np
+import pandas as pd
+from rapidfuzz.process import cpdist
+from rapidfuzz.distance import JaroWinkler
+from rapidfuzz.fuzz import token_sort_ratio
+from sqlalchemy import select, bindparam
+
+from database import AsyncSessionLocal, engine
+from models import Provider
+
+MATCH_THRESHOLD = 0.85
+# Blocks bigger than this are too generic to be useful (e.g. "S530" + "100")
+# and would reintroduce quadratic pair counts.
+MAX_BLOCK_SIZE = 200
+
+NAME_WEIGHT = 0.55
+ADDRESS_WEIGHT = 0.25
+PHONE_WEIGHT = 0.10
+ZIP_WEIGHT = 0.10
+
+_SOUNDEX_CODES = {
+    **dict.fromkeys("BFPV", "1"),
+    **dict.fromkeys("CGJKQSXZ", "2"),
+    **dict.fromkeys("DT", "3"),
+    "L": "4",
+    **dict.fromkeys("MN", "5"),
+    "R": "6",
+}
+
+
+def soundex(name: str) -> str:
+    """American Soundex code, e.g. 'Robert' -> 'R163'. Empty string if no letters."""
+    letters = re.sub(r"[^A-Z]", "", (name or "").upper())
+    if not letters:
+        return ""
+    code = letters[0]
+    prev = _SOUNDEX_CODES.get(letters[0], "")
+    for ch in letters[1:]:
+        digit = _SOUNDEX_CODES.get(ch, "")
+        if digit and digit != prev:
+            code += digit
+        if ch not in "HW":
+            prev = digit
+    return (code + "000")[:4]
+
+
+def add_blocking_keys(df: pd.DataFrame) -> pd.DataFrame:
+    """Add block_name_zip3 / block_phone columns (None = no key) and a normalized npi_key."""
+    last = df["last_name"].fillna(df["display_name"].fillna("").str.split().str[-1])
+    unique_last = last.dropna().unique()
+    codes = pd.Series([soundex(n) for n in unique_last], index=unique_last)
+    zip3 = df["postal_code"].fillna("").str.replace(r"\D", "", regex=True).str[:3]
+
+    name_code = last.map(codes).fillna("")
+    df["block_name_zip3"] = (name_code + "|" + zip3).where((name_code != "") & (zip3.str.len() == 3))
+
+    phone = df["phone"].fillna("").str.replace(r"\D", "", regex=True).str[-10:]
+    df["block_phone"] = phone.where(phone.str.len() == 10)
+    # Not a blocking key: npi is unique in providers_master, so an NPI block
+    # would never hold two rows there. score_pairs uses it to confirm or veto.
+    df["npi_key"] = df["npi"].where(df["npi"].fillna("").str.len() == 10)
+    return df
+
+
+def candidate_pairs(df: pd.DataFrame, keys=("block_name_zip3", "block_phone")) -> np.ndarray:
+    """
+    Union of within-block pairs over all blocking keys, as an (n, 2) array of
+    row positions with left < right.
+    """
+    pos = pd.Series(np.arange(len(df)), index=df.index)
+    all_pairs = []
+    for key in keys:
+        block = pd.DataFrame({"key": df[key].values, "pos": pos.values}).dropna(subset=["key"])
+        sizes = block.groupby("key")["pos"].transform("size")
+        block = block[(sizes > 1) & (sizes <= MAX_BLOCK_SIZE)]
+        if block.empty:
+            continue
+        merged = block.merge(block, on="key", suffixes=("_l", "_r"))
+        merged = merged[merged["pos_l"] < merged["pos_r"]]
+        all_pairs.append(merged[["pos_l", "pos_r"]].to_numpy())
+    if not all_pairs:
+        return np.empty((0, 2), dtype=np.int64)
+    return np.unique(np.vstack(all_pairs), axis=0)
+
+
+def score_pairs(df: pd.DataFrame, pairs: np.ndarray) -> np.ndarray:
+    """
+    Weighted name / address / phone / ZIP similarity in [0, 1] for each pair.
+    Two different NPIs score 0: an individual has exactly one, so colleagues
+    at the same practice with similar names are never merged.
+    """
+    if len(pairs) == 0:
+        return np.empty(0)
+    left, right = pairs[:, 0], pairs[:, 1]
+
+    names = df["display_name"].fillna("").str.upper().to_numpy()
+    addrs = df["address_line1"].fillna("").str.upper().to_numpy()
+    phones = df["block_phone"].to_numpy()
+    zips = df["postal_code"].fillna("").str[:5].to_numpy()
+
+    name_sim = cpdist(names[left], names[right], scorer=JaroWinkler.normalized_similarity, workers=-1)
+    addr_sim = cpdist(addrs[left], addrs[right], scorer=token_sort_ratio, workers=-1) / 100.0
+
+    phone_eq = (phones[left] == phones[right]) & pd.notna(phones[left])
+    zip_eq = (zips[left] == zips[right]) & (zips[left] != "")
+
+    score = (
+        NAME_WEIGHT * name_sim
+        + ADDRESS_WEIGHT * addr_sim
+        + PHONE_WEIGHT * phone_eq
+        + ZIP_WEIGHT * zip_eq
+    )
+
+    # Same NPI is the same provider regardless of how the rest was typed
+    # (only possible on input that isn't already unique by NPI)
+    npis = df["npi_key"].to_numpy()
+    both_npi = pd.notna(npis[left]) & pd.notna(npis[right])
+    same_npi = both_npi & (npis[left] == npis[right])
+    score = np.where(same_npi, 1.0, score)
+    return np.where(both_npi & ~same_npi, 0.0, score)
+
+
+def union_find_clusters(n: int, pairs: np.ndarray, npis=None) -> np.ndarray:
+    """
+    Connected components over matched pairs; returns a root index per row.
+    With npis, two clusters that already hold different NPIs are never
+    joined, so a record without an NPI can't chain two providers together.
+    Pass pairs best match first so that record joins its closest one.
+    """
+    parent = list(range(n))
+    cluster_npi = [None if npis is None or pd.isna(npis[i]) else npis[i] for i in range(n)]
+
+    def find(x):
+        root = x
+        while parent[root] != root:
+            root = parent[root]
+        while parent[x] != root:
+            parent[x], x = root, parent[x]
+        return root
+
+    for a, b in pairs:
+        ra, rb = find(a), find(b)
+        if ra != rb:
+            if cluster_npi[ra] is not None and cluster_npi[rb] is not None and cluster_npi[ra] != cluster_npi[rb]:
+                continue
+            cluster_npi[ra] = cluster_npi[rb] = cluster_npi[ra] or cluster_npi[rb]
+            # Lower index becomes the root so cluster ids are stable
+            if ra < rb:
+                parent[rb] = ra
+            else:
+                parent[ra] = rb
+
+    return np.array([find(i) for i in range(n)])
+
+
+def find_duplicate_clusters(df: pd.DataFrame, threshold: float = MATCH_THRESHOLD) -> pd.Series:
+    """
+    df needs provider_id, npi, display_name, last_name, address_line1,
+    postal_code, phone. Returns duplicate_cluster_id per row (the smallest
+    provider_id in the cluster), or NA for rows with no duplicate.
+    """
+    df = add_blocking_keys(df.reset_index(drop=True))
+    pairs = candidate_pairs(df)
+    scores = score_pairs(df, pairs)
+    keep = scores >= threshold
+    matched = pairs[keep][np.argsort(-scores[keep], kind="stable")]
+
+    roots = union_find_clusters(len(df), matched, df["npi_key"].to_numpy())
+    provider_ids = df["provider_id"].to_numpy()
+    cluster_ids = pd.Series(provider_ids, dtype="Int64").groupby(roots).transform("min")
+    cluster_sizes = pd.Series(roots).map(pd.Series(roots).value_counts())
+    cluster_ids[cluster_sizes.to_numpy() == 1] = pd.NA
+
+    print(f"Dedupe: {len(df)} rows, {len(pairs)} candidate pairs, {len(matched)} matches, "
+          f"{cluster_ids.nunique()} duplicate clusters")
+    return pd.Series(cluster_ids.to_numpy(), index=provider_ids, name="duplicate_cluster_id")
+
+
+async def run_dedupe_job(threshold: float = MATCH_THRESHOLD) -> dict:
+    """
+    Cluster duplicates across providers_master and write duplicate_cluster_id
+    back. Only rows whose cluster changed are written, and updated_at is left
+    alone: a dedupe pass isn't an edit to the provider.
+    """
+    start = time.perf_counter()
+    cols = [
+        Provider.provider_id, Provider.npi, Provider.display_name, Provider.last_name,
+        Provider.address_line1, Provider.postal_code, Provider.phone, Provider.duplicate_cluster_id,
+    ]
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(select(*cols))
+        df = pd.DataFrame(result.all(), columns=[c.key for c in cols])
+
+    current = pd.Series(df.pop("duplicate_cluster_id").to_numpy(), index=df["provider_id"].to_numpy(), dtype="Int64")
+    clusters = find_duplicate_clusters(df, threshold)
+    changed = clusters[clusters.fillna(-1) != current.reindex(clusters.index).fillna(-1)]
+
+    if not changed.empty:
+        table = Provider.__table__
+        async with engine.begin() as conn:
+            await conn.execute(
+                table.update()
+                .where(table.c.provider_id == bindparam("pid"))
+                .values(duplicate_cluster_id=bindparam("cid"), updated_at=table.c.updated_at),
+                [{"pid": int(pid), "cid": None if pd.isna(cid) else int(cid)} for pid, cid in changed.items()],
+            )
+    clusters = clusters.dropna()
+
+    stats = {
+        "rows": len(df),
+        "clustered_rows": len(clusters),
+        "clusters": int(clusters.nunique()),
+        "changed_rows": len(changed),
+        "seconds": round(time.perf_counter() - start, 2),
+    }
+    print(f"✓ Dedupe done: {stats}")
+    return stats
+
+
+def synthetic_providers(n: int, dup_rate: float = 0.1, seed: int = 0) -> pd.DataFrame:
+    """n fake providers, dup_rate of them near-duplicates (typos, suite lines, phone formats)."""
+    rng = random.Random(seed)
+    syll = ["AN", "BER", "CO", "DA", "EL", "FI", "GA", "HO", "IN", "JO", "KA", "LI", "MO", "NE", "OR", "PA", "RI", "SO", "TU", "VA"]
+    streets = ["MAIN ST", "OAK AVE", "GRAND BLVD", "PARK RD", "VILLAGE DR", "LAKE ST"]
+
+    rows = []
+    for i in range(n):
+        last = "".join(rng.choice(syll) for _ in range(rng.randint(2, 4)))
+        first = "".join(rng.choice(syll) for _ in range(2))
+        rows.append({
+            "provider_id": i + 1,
+            "npi": str(1000000000 + i),
+            "display_name": f"{first} {last}",
+            "last_name": last,
+            "address_line1": f"{rng.randint(1, 9999)} {rng.choice(streets)}",
+            "postal_code": f"{rng.randint(10000, 99999)}",
+            "phone": f"{rng.randint(200, 999)}-{rng.randint(200, 999)}-{rng.randint(1000, 9999)}",
+        })
+
+    for j in range(int(n * dup_rate)):
+        src = dict(rows[rng.randrange(n)])
+        name = list(src["display_name"])
+        k = rng.randrange(len(name))
+        name[k] = rng.choice("AEIOU")
+        src.update({
+            "provider_id": len(rows) + 1,
+            "npi": None,
+            "display_name": "".join(name),
+            "address_line1": src["address_line1"] + rng.choice(["", " STE 100", " FL 2"]),
+            "phone": "(" + src["phone"].replace("-", ") ", 1),
+        })
+        rows.append(src)
+    return pd.DataFrame(rows)
+
+
+def check_known_cases() -> None:
+    """Hand-made pairs with a known answer; raises AssertionError on a wrong match."""
+    practice = {"last_name": "MILLER", "address_line1": "100 MAIN ST", "postal_code": "63104", "phone": "314-555-0100"}
+    df = pd.DataFrame([
+        # Colleagues at one practice: different NPIs must never merge
+        {"provider_id": 1, "npi": "1234567893", "display_name": "DAVID MILLER", **practice},
+        {"provider_id": 2, "npi": "1891106191", "display_name": "DANIEL MILLER", **practice},
+        # The same doctor re-entered without an NPI still merges
+        {"provider_id": 3, "npi": None, "display_name": "DAVID MILER", **practice},
+    ])
+    clusters = find_duplicate_clusters(df)
+    assert pd.isna(clusters[2]), "different NPIs were clustered together"
+    assert clusters[1] == clusters[3] == 1, "a near-duplicate without an NPI was missed"
+
+
+def benchmark(sizes=(25_000, 50_000, 100_000, 200_000)) -> None:
+    """Time find_duplicate_clusters at doubling sizes; us/row should stay flat."""
+    check_known_cases()
+    results = []
+    for n in sizes:
+        df = synthetic_providers(n)
+        start = time.perf_counter()
+        find_duplicate_clusters(df)
+        results.append((len(df), time.perf_counter() - start))
+
+    print(f"{'rows':>10} {'seconds':>9} {'us/row':>8}")
+    for rows, elapsed in results:
+        print(f"{rows:>10} {elapsed:>9.2f} {elapsed / rows * 1e6:>8.1f}")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Find duplicate providers in providers_master")
+    parser.add_argument("--threshold", type=float, default=MATCH_THRESHOLD)
+    parser.add_argument("--bench", action="store_true", help="benchmark scaling on synthetic data instead")
+    args = parser.parse_args()
+
+    if args.bench:
+        benchmark()
+    else:
+        asyncio.run(run_dedupe_job(args.threshold))
@@ -0,0 +1,220 @@
+# jobs.py
+import os
+import csv
+import json
+import time
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from sqlalchemy import select, update
+
+from database import AsyncSessionLocal
+from models import Job
+from repo_paths import DATA_DIR, add_repo_dir
+from schemas import JobOut
+
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+JOB_OUTPUT_DIR = os.path.join(DATA_DIR, "jobs")
+PROGRESS_PERSIST_INTERVAL = 1.0  # seconds between progress writes to the jobs table
+SSE_POLL_INTERVAL = 1.0
+SSE_KEEPALIVE_EVERY = 15         # polls without a change before sending a comment ping
+TERMINAL_STATUSES = {"succeeded", "failed", "interrupted"}
+
+
+def resolve_data_path(path: str) -> str:
+    """Resolve a job file path relative to Data/, refusing anything outside it."""
+    full = os.path.abspath(os.path.join(DATA_DIR, path))
+    if os.path.commonpath([full, DATA_DIR]) != DATA_DIR:
+        raise ValueError(f"Path must be inside {DATA_DIR}: {path}")
+    return full
+
+
+class ProgressReporter:
+    """
+    Called from the worker thread as reporter(rows_done, errors). Computes
+    rows/sec and ETA and persists them at most every PROGRESS_PERSIST_INTERVAL.
+    """
+
+    def __init__(self, runner: "JobRunner", job_id: str):
+        self.runner = runner
+        self.job_id = job_id
+        self.rows_total = None
+        self.rows_done = 0
+        self.errors = 0
+        self.started = time.perf_counter()
+        self.last_persist = 0.0
+
+    def set_total(self, rows_total: int) -> None:
+        self.rows_total = rows_total
+        self.runner.update_job(self.job_id, rows_total=rows_total)
+
+    def __call__(self, rows_done: int, errors: int = 0) -> None:
+        self.rows_done = rows_done
+        self.errors = errors
+        now = time.perf_counter()
+        if now - self.last_persist >= PROGRESS_PERSIST_INTERVAL:
+            self.flush()
+
+    def flush(self) -> None:
+        self.last_persist = time.perf_counter()
+        elapsed = self.last_persist - self.started
+        rate = self.rows_done / elapsed if elapsed > 0 else None
+        eta = None
+        if rate and self.rows_total is not None:
+            eta = max(self.rows_total - self.rows_done, 0) / rate
+        self.runner.update_job(
+            self.job_id,
+            rows_done=self.rows_done,
+            error_count=self.errors,
+            rows_per_sec=round(rate, 2) if rate else None,
+            eta_seconds=round(eta, 1) if eta is not None else None,
+        )
+
+
+def run_validate_job(params: dict, output_path: str, report: ProgressReporter) -> None:
+    add_repo_dir("Validation")
+    add_repo_dir("Agents")  # gemini_compare calls through llm_gateway
+    from Validate import validate_csv_with_gemini
+
+    input_path = resolve_data_path(params["input_path"])
+    with open(input_path, newline="", encoding="utf-8") as f:
+        report.set_total(sum(1 for _ in csv.DictReader(f)))
+
+    validate_csv_with_gemini(input_path, output_path, progress_callback=report)
+
+
+def run_extract_job(params: dict, output_path: str, report: ProgressReporter) -> None:
+    """Extract each PDF / image in params["input_paths"]; one JSON line per file."""
+    add_repo_dir("Agents")
+    from extractor_agent import HealthcareExtractionModel
+
+    paths = [resolve_data_path(p) for p in params["input_paths"]]
+    report.set_total(len(paths))
+    extractor = HealthcareExtractionModel()
+    errors = 0
+
+    with open(output_path, "w", encoding="utf-8") as out:
+        for i, path in enumerate(paths, start=1):
+            raw_text = extractor.load_content(path)
+            profile = extractor.extract_provider_data(raw_text)
+
+            if profile is None:
+                errors += 1
+            out.write(json.dumps({
+                "source": os.path.relpath(path, DATA_DIR),
+                "profile": profile.model_dump(mode="json") if profile else None,
+            }) + "\n")
+            out.flush()
+            report(i, errors)
+
+
+JOB_HANDLERS = {
+    "validate": (run_validate_job, ".csv"),
+    "extract": (run_extract_job, ".jsonl"),
+}
+
+
+class JobRunner:
+    """
+    Runs jobs on a thread pool outside the request path. All state lives in
+    the jobs table, so progress can be followed from any request or process.
+    """
+
+    def __init__(self, max_workers: int = JOB_WORKERS):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self.loop = None
+
+    async def start(self) -> None:
+        self.loop = asyncio.get_running_loop()
+        # Anything still queued/running belonged to a process that went away
+        async with AsyncSessionLocal() as session:
+            await session.execute(
+                update(Job)
+                .where(Job.status.in_(["queued", "running"]))
+                .values(status="interrupted", finished_at=datetime.utcnow())
+            )
+            await session.commit()
+
+    def shutdown(self) -> None:
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    async def submit(self, kind: str, params: dict) -> Job:
+        if kind not in JOB_HANDLERS:
+            raise ValueError(f"Unknown job kind: {kind}")
+        _, suffix = JOB_HANDLERS[kind]
+        if kind == "validate" and params.get("output_format") == "parquet":
+            suffix = ".parquet"
+        # Fail fast on bad paths instead of inside the worker
+        for path in [params.get("input_path"), *(params.get("input_paths") or [])]:
+            if path:
+                resolve_data_path(path)
+
+        job = Job(kind=kind, params=params, status="queued", rows_done=0, error_count=0)
+        async with AsyncSessionLocal() as session:
+            session.add(job)
+            await session.flush()
+            if params.get("output_path"):
+                job.output_path = resolve_data_path(params["output_path"])
+            else:
+                job.output_path = os.path.join(JOB_OUTPUT_DIR, f"{job.job_id}{suffix}")
+            await session.commit()
+
+        self.executor.submit(self._run, job.job_id, kind, params, job.output_path)
+        return job
+
+    async def _update_async(self, job_id: str, values: dict) -> None:
+        async with AsyncSessionLocal() as session:
+            await session.execute(update(Job).where(Job.job_id == job_id).values(**values))
+            await session.commit()
+
+    def update_job(self, job_id: str, **values) -> None:
+        """Persist job fields from a worker thread via the app's event loop."""
+        asyncio.run_coroutine_threadsafe(self._update_async(job_id, values), self.loop).result()
+
+    def _run(self, job_id: str, kind: str, params: dict, output_path: str) -> None:
+        handler, _ = JOB_HANDLERS[kind]
+        report = ProgressReporter(self, job_id)
+        self.update_job(job_id, status="running", started_at=datetime.utcnow())
+        try:
+            os.makedirs(os.path.dirname(output_path), exist_ok=True)
+            handler(params, output_path, report)
+            report.flush()
+            self.update_job(job_id, status="succeeded", eta_seconds=0.0, finished_at=datetime.utcnow())
+        except Exception as e:
+            print(f"[WARN] Job {job_id} failed: {e}")
+            report.flush()
+            self.update_job(job_id, status="failed", error=str(e), finished_at=datetime.utcnow())
+
+
+async def job_event_stream(job_id: str):
+    """
+    Server-Sent Events for one job: a `data:` event whenever its persisted
+    state changes, then an `end` event once the job reaches a terminal
+    status, so the client closes instead of reconnecting.
+    """
+    last_payload = None
+    idle_polls = 0
+    while True:
+        async with AsyncSessionLocal() as session:
+            job = await session.scalar(select(Job).where(Job.job_id == job_id))
+
+        if job is None:
+            yield f"event: error\ndata: {json.dumps({'detail': 'job not found'})}\n\n"
+            return
+
+        payload = JobOut.model_validate(job).model_dump_json()
+        if payload != last_payload:
+            yield f"data: {payload}\n\n"
+            last_payload = payload
+            idle_polls = 0
+        else:
+            idle_polls += 1
+            if idle_polls >= SSE_KEEPALIVE_EVERY:
+                yield ": keepalive\n\n"
+                idle_polls = 0
+
+        if job.status in TERMINAL_STATUSES:
+            yield f"event: end\ndata: {json.dumps({'status': job.status})}\n\n"
+            return
+        await asyncio.sleep(SSE_POLL_INTERVAL)
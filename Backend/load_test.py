@@ -0,0 +1,95 @@
+# load_test.py
+import time
+import random
+import asyncio
+import statistics
+
+from sqlalchemy import select, func
+
+from database import engine, AsyncSessionLocal, init_db
+from db_metrics import db_metrics
+from models import Provider
+from provider_search import search_providers
+from bulk_loader import bulk_upsert_providers, synthetic_validation_rows, validation_row_to_provider_row
+
+STATES = ["MO", "NC", "KS", "IL", "TX", "CA", "NY", "FL"]
+SPECIALTIES = ["Internal Medicine", "Cardiology", "Pediatrics", "Family Practice"]
+STATUSES = ["verified", "needs_review"]
+
+
+async def seed(n_rows: int) -> None:
+    """Top providers_master up to n_rows synthetic rows."""
+    async with AsyncSessionLocal() as session:
+        existing = await session.scalar(select(func.count()).select_from(Provider))
+    if existing >= n_rows:
+        print(f"providers_master already has {existing} rows, skipping seed")
+        return
+    rows = (validation_row_to_provider_row(r) for r in synthetic_validation_rows(n_rows))
+    await bulk_upsert_providers(rows, batch_size=20000)
+
+
+def random_query(n_rows: int) -> dict:
+    kind = random.choice(["npi", "state_status", "postal", "specialty", "confidence", "deep_page"])
+    if kind == "npi":
+        return {"npi": str(1000000000 + random.randrange(n_rows))}
+    if kind == "state_status":
+        return {"state": random.choice(STATES), "status": random.choice(STATUSES)}
+    if kind == "postal":
+        return {"postal_code": str(63000 + random.randrange(1000))}
+    if kind == "specialty":
+        return {"specialty": random.choice(SPECIALTIES), "state": random.choice(STATES)}
+    if kind == "confidence":
+        lo = random.random() * 0.9
+        return {"min_confidence": lo, "max_confidence": lo + 0.1}
+    # Keyset makes page 10,000 as cheap as page 1
+    return {"state": random.choice(STATES), "cursor": random.randrange(n_rows)}
+
+
+async def run_queries(n_rows: int, n_queries: int, concurrency: int) -> dict:
+    latencies = []
+    sem = asyncio.Semaphore(concurrency)
+
+    async def one():
+        params = random_query(n_rows)
+        async with sem, AsyncSessionLocal() as session:
+            start = time.perf_counter()
+            await search_providers(session, limit=50, **params)
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(n_queries)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    pct = lambda p: latencies[min(len(latencies) - 1, int(p * len(latencies)))]
+    return {
+        "queries": n_queries,
+        "qps": round(n_queries / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies), 2),
+        "p95_ms": round(pct(0.95), 2),
+        "p99_ms": round(pct(0.99), 2),
+        "max_ms": round(latencies[-1], 2),
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+    from repo_paths import add_repo_dir
+
+    add_repo_dir("Validation")  # bulk_loader maps rows with row_projection
+
+    parser = argparse.ArgumentParser(description="Load test the provider search service")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+
+    async def main():
+        await init_db()
+        await seed(args.rows)
+        db_metrics.reset()  # report the query phase only, not the seed
+        stats = await run_queries(args.rows, args.queries, args.concurrency)
+        print(f"Search load test on {args.rows} rows ({engine.dialect.name}): {stats}")
+        db_metrics.report()
+
+    asyncio.run(main())
@@ -0,0 +1,131 @@
+# main.py
+import os
+import sys
+from contextlib import asynccontextmanager
+from typing import List, Optional
+
+from fastapi import FastAPI, Depends, HTTPException, Query
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database import get_db, init_db, engine, ENGINE_PROFILE_NAME
+from db_metrics import db_metrics
+from models import Provider, Job
+from provider_search import search_providers, MAX_PAGE_SIZE
+from jobs import JobRunner, job_event_stream
+from schemas import ProviderOut, ProviderPage, JobCreate, JobOut
+
+# The React dev server (frontend/) runs on its own origin
+FRONTEND_ORIGINS = os.getenv("FRONTEND_ORIGINS", "http://localhost:3000").split(",")
+
+job_runner = JobRunner()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await init_db()
+    await job_runner.start()
+    yield
+    job_runner.shutdown()
+
+
+app = FastAPI(title="Provider Directory API", lifespan=lifespan)
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=FRONTEND_ORIGINS,
+    allow_methods=["*"],
+    allow_headers=["*"],
+)
+
+
+@app.get("/providers", response_model=ProviderPage)
+async def list_providers(
+    npi: Optional[str] = None,
+    state: Optional[str] = Query(None, min_length=2, max_length=2),
+    postal_code: Optional[str] = None,
+    specialty: Optional[str] = None,
+    language: Optional[str] = None,
+    status: Optional[str] = None,
+    name: Optional[str] = Query(None, min_length=3),
+    min_confidence: Optional[float] = Query(None, ge=0.0, le=1.0),
+    max_confidence: Optional[float] = Query(None, ge=0.0, le=1.0),
+    cursor: Optional[int] = None,
+    limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_db),
+):
+    items, next_cursor = await search_providers(
+        db,
+        npi=npi,
+        state=state,
+        postal_code=postal_code,
+        specialty=specialty,
+        language=language,
+        status=status,
+        name=name,
+        min_confidence=min_confidence,
+        max_confidence=max_confidence,
+        cursor=cursor,
+        limit=limit,
+    )
+    return ProviderPage(items=items, next_cursor=next_cursor)
+
+
+@app.get("/providers/{npi}", response_model=ProviderOut)
+async def get_provider(npi: str, db: AsyncSession = Depends(get_db)):
+    provider = await db.scalar(select(Provider).where(Provider.npi == npi))
+    if provider is None:
+        raise HTTPException(status_code=404, detail=f"No provider with NPI {npi}")
+    return provider
+
+
+@app.post("/jobs", response_model=JobOut, status_code=202)
+async def create_job(body: JobCreate):
+    if body.kind == "validate" and not body.input_path:
+        raise HTTPException(status_code=422, detail="validate jobs need input_path")
+    if body.kind == "extract" and not body.input_paths:
+        raise HTTPException(status_code=422, detail="extract jobs need input_paths")
+    try:
+        return await job_runner.submit(body.kind, body.model_dump(exclude={"kind"}))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.get("/jobs", response_model=List[JobOut])
+async def list_jobs(limit: int = Query(20, ge=1, le=200), db: AsyncSession = Depends(get_db)):
+    return list(await db.scalars(select(Job).order_by(Job.created_at.desc()).limit(limit)))
+
+
+@app.get("/jobs/{job_id}", response_model=JobOut)
+async def get_job(job_id: str, db: AsyncSession = Depends(get_db)):
+    job = await db.get(Job, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"No job {job_id}")
+    return job
+
+
+@app.get("/jobs/{job_id}/events")
+async def job_events(job_id: str):
+    """Live job progress as Server-Sent Events (rows done, rows/sec, ETA, errors)."""
+    return StreamingResponse(
+        job_event_stream(job_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+
+@app.get("/metrics")
+async def metrics(top: int = Query(20, ge=1, le=200)):
+    """DB statement latency histograms, pool waits and slow queries, plus LLM gateway counters."""
+    out = {"db": {"profile": ENGINE_PROFILE_NAME, **db_metrics.snapshot(engine, top=top)}}
+    # Only report the gateway if a job has already loaded it in this process
+    gateway = sys.modules.get("llm_gateway")
+    if gateway is not None:
+        out["llm"] = gateway.get_gateway().snapshot()
+    return out
+
+if __name__ == "__main__":
+    import uvicorn
+    uvicorn.run("main:app", host="127.0.0.1", port=8000)
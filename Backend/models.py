@@ -1,11 +1,32 @@
-from sqlalchemy import String, Float, Text, JSON, DateTime, Integer, Boolean, ARRAY
+from sqlalchemy import String, Float, Text, JSON, DateTime, Integer, Boolean, Index, func
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.orm import Mapped, mapped_column
 from datetime import datetime
 from uuid import uuid4
 from database import Base
 
+# Native ARRAY on Postgres (the dialect type, for @> in provider_search); JSON list
+# when running against a local SQLite stand-in
+StringList = ARRAY(String).with_variant(JSON, "sqlite")
+
 class Provider(Base):
     __tablename__ = "providers_master"
+    __table_args__ = (
+        # Search API filters (see provider_search.py). With state and status
+        # both equality-filtered, provider_id trailing the composite lets a
+        # keyset page read in index order without a sort. A state-only filter
+        # (deep pages) can't use that order; it walks the primary key and
+        # filters, which is cheap only while matching rows are common.
+        Index("ix_providers_state_status", "state", "status", "provider_id"),
+        Index("ix_providers_postal_code", "postal_code", postgresql_ops={"postal_code": "text_pattern_ops"}),
+        Index("ix_providers_confidence", "overall_confidence"),
+        Index("ix_providers_last_verified", "last_verified"),
+        Index("ix_providers_specialties_gin", "specialties", postgresql_using="gin"),
+        Index("ix_providers_languages_gin", "languages", postgresql_using="gin"),
+        # Name search; needs the pg_trgm extension (created in init_db).
+        # display_name already holds last_name, so one index covers it.
+        Index("ix_providers_display_name_trgm", "display_name", postgresql_using="gin", postgresql_ops={"display_name": "gin_trgm_ops"}),
+    )
 
     # Primary Key
     provider_id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
@@ -20,7 +41,7 @@ class Provider(Base):
     
     # Professional Details
     taxonomy_code: Mapped[str] = mapped_column(String, nullable=True)
-    specialties: Mapped[list[str]] = mapped_column(ARRAY(String), nullable=True)
+    specialties: Mapped[list[str]] = mapped_column(StringList, nullable=True)
     license_number: Mapped[str] = mapped_column(String, nullable=True) # From original request
     
     # Contact Info
@@ -41,16 +62,18 @@ class Provider(Base):
     # Operational
     accepting_new_patients: Mapped[bool] = mapped_column(Boolean, nullable=True)
     telehealth: Mapped[bool] = mapped_column(Boolean, nullable=True)
-    languages: Mapped[list[str]] = mapped_column(ARRAY(String), nullable=True)
+    languages: Mapped[list[str]] = mapped_column(StringList, nullable=True)
     
     # Metadata
     last_verified: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
     overall_confidence: Mapped[float] = mapped_column(Float, nullable=True)
     status: Mapped[str] = mapped_column(String, default="needs_review") # verified / needs_review / rejected
+    nppes_last_updated: Mapped[str] = mapped_column(String, nullable=True) # NPPES basic.last_updated at last verification
+    duplicate_cluster_id: Mapped[int] = mapped_column(Integer, nullable=True, index=True) # set by dedupe_providers.py
     
-    # Timestamps
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
-    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Timestamps. server_default too: bulk_loader's COPY merge inserts without them
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, server_default=func.now())
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, server_default=func.now())
 
     # --- RAW DATA STORE ---
     raw_data_json: Mapped[dict] = mapped_column(JSON, nullable=True)
@@ -75,3 +98,27 @@ class Provider(Base):
 
     license_status: Mapped[str] = mapped_column(String, nullable=True)
     license_confidence: Mapped[float] = mapped_column(Float, nullable=True)
+
+
+class Job(Base):
+    __tablename__ = "jobs"
+
+    job_id: Mapped[str] = mapped_column(String, primary_key=True, default=lambda: str(uuid4()))
+    kind: Mapped[str] = mapped_column(String) # validate / extract
+    status: Mapped[str] = mapped_column(String, default="queued") # queued / running / succeeded / failed / interrupted
+    params: Mapped[dict] = mapped_column(JSON, nullable=True)
+
+    # Progress (updated by the worker while running)
+    rows_total: Mapped[int] = mapped_column(Integer, nullable=True)
+    rows_done: Mapped[int] = mapped_column(Integer, default=0)
+    error_count: Mapped[int] = mapped_column(Integer, default=0)
+    rows_per_sec: Mapped[float] = mapped_column(Float, nullable=True)
+    eta_seconds: Mapped[float] = mapped_column(Float, nullable=True)
+
+    # Partial results are appended here as the job runs
+    output_path: Mapped[str] = mapped_column(String, nullable=True)
+    error: Mapped[str] = mapped_column(Text, nullable=True)
+
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    started_at: Mapped[datetime] = mapped_column(DateTime, nullable=True)
+    finished_at: Mapped[datetime] = mapped_column(DateTime, nullable=True)
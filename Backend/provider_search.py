@@ -0,0 +1,74 @@
+# provider_search.py
+import json
+from typing import Optional
+
+from sqlalchemy import select, String, cast
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models import Provider
+
+MAX_PAGE_SIZE = 500
+
+
+def _contains(session: AsyncSession, column, value: str):
+    # ARRAY @> on Postgres (served by the GIN index); JSON text match on SQLite,
+    # escaped so a % or _ in the value is matched literally
+    if session.bind.dialect.name == "postgresql":
+        return column.contains([value])
+    return cast(column, String).contains(json.dumps(value), autoescape=True)
+
+
+async def search_providers(
+    session: AsyncSession,
+    npi: Optional[str] = None,
+    state: Optional[str] = None,
+    postal_code: Optional[str] = None,
+    specialty: Optional[str] = None,
+    language: Optional[str] = None,
+    status: Optional[str] = None,
+    name: Optional[str] = None,
+    min_confidence: Optional[float] = None,
+    max_confidence: Optional[float] = None,
+    cursor: Optional[int] = None,
+    limit: int = 50,
+) -> tuple[list[Provider], Optional[int]]:
+    """
+    Filter providers_master with keyset pagination on provider_id.
+    Returns (providers, next_cursor); next_cursor is None on the last page.
+    postal_code matches as a prefix, so "63104" also finds ZIP+4 rows.
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+
+    stmt = select(Provider)
+    if npi:
+        stmt = stmt.where(Provider.npi == npi)
+    if state:
+        stmt = stmt.where(Provider.state == state.upper())
+    if status:
+        stmt = stmt.where(Provider.status == status)
+    if postal_code:
+        stmt = stmt.where(Provider.postal_code.startswith(postal_code, autoescape=True))
+    if specialty:
+        stmt = stmt.where(_contains(session, Provider.specialties, specialty))
+    if language:
+        stmt = stmt.where(_contains(session, Provider.languages, language))
+    if name:
+        # display_name is "first last" (or the organization name), so this
+        # covers last names too and is served by its trigram index (ILIKE on Postgres)
+        stmt = stmt.where(Provider.display_name.icontains(name, autoescape=True))
+    if min_confidence is not None:
+        stmt = stmt.where(Provider.overall_confidence >= min_confidence)
+    if max_confidence is not None:
+        stmt = stmt.where(Provider.overall_confidence <= max_confidence)
+    if cursor is not None:
+        stmt = stmt.where(Provider.provider_id > cursor)
+
+    # Fetch one extra row to know whether another page exists
+    stmt = stmt.order_by(Provider.provider_id).limit(limit + 1)
+    rows = list((await session.scalars(stmt)).all())
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = rows[-1].provider_id
+    return rows, next_cursor
@@ -0,0 +1,19 @@
+# repo_paths.py
+import os
+import sys
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+DATA_DIR = os.path.join(REPO_ROOT, "Data")
+
+
+def add_repo_dir(name: str) -> str:
+    """
+    Make a sibling folder of plain scripts (Agents/, Validation/) importable,
+    e.g. add_repo_dir("Validation") before `from NPI import lookup_npi`.
+    Call it from entry points (cli.py, jobs, __main__ blocks); library
+    modules import across folders lazily and never touch sys.path.
+    """
+    path = os.path.join(REPO_ROOT, name)
+    if path not in sys.path:
+        sys.path.append(path)
+    return path
@@ -0,0 +1,234 @@
+# reverify_scheduler.py
+import time
+import heapq
+import asyncio
+from datetime import datetime
+
+from sqlalchemy import select, update
+
+from database import AsyncSessionLocal
+from models import Provider
+from bulk_loader import bulk_upsert_providers, validation_row_to_provider_row
+from repo_paths import add_repo_dir
+
+STALE_AFTER_DAYS = 180         # age at which the age term reaches 1.0
+AGE_WEIGHT = 1.0
+CONFIDENCE_WEIGHT = 1.0
+NPPES_CHANGED_BOOST = 2.0      # known NPPES change outranks any age/confidence mix
+SKIP_LLM_MIN_CONFIDENCE = 0.8  # unchanged in NPPES and at least this confident -> no Gemini call
+
+# Columns validate_csv_with_gemini adds; dropped before re-sending a stored row
+RESULT_PREFIXES = ("gemini_", "npi_lookup_", "npi_last_")
+
+
+def priority(
+    last_verified: datetime | None,
+    confidence: float | None,
+    now: datetime,
+    nppes_changed: bool = False,
+    stale_after_days: int = STALE_AFTER_DAYS,
+) -> float:
+    """
+    Higher = re-verify sooner. Combines age since last verification (capped
+    at 2x stale_after_days), low confidence, and a known NPPES change.
+    """
+    if last_verified is None:
+        age_term = 2.0
+    else:
+        age_term = min((now - last_verified).total_seconds() / 86400 / stale_after_days, 2.0)
+    confidence_term = 1.0 - (confidence if confidence is not None else 0.0)
+
+    score = AGE_WEIGHT * age_term + CONFIDENCE_WEIGHT * confidence_term
+    if nppes_changed:
+        score += NPPES_CHANGED_BOOST
+    return score
+
+
+async def build_queue(
+    size: int,
+    changed_npis: set[str] | None = None,
+    stale_after_days: int = STALE_AFTER_DAYS,
+) -> list[tuple]:
+    """
+    Stream providers_master and keep the `size` highest-priority providers.
+    changed_npis is an optional set of NPIs already known to have changed
+    (e.g. from the weekly NPPES update file).
+    Returns [(score, provider_id, npi, nppes_last_updated, confidence)], best first.
+    """
+    changed_npis = changed_npis or set()
+    now = datetime.utcnow()
+    heap = []
+
+    stmt = select(
+        Provider.provider_id,
+        Provider.npi,
+        Provider.last_verified,
+        Provider.overall_confidence,
+        Provider.nppes_last_updated,
+    ).where(Provider.npi.is_not(None))
+
+    async with AsyncSessionLocal() as session:
+        result = await session.stream(stmt.execution_options(yield_per=10000))
+        async for pid, npi, last_verified, confidence, last_updated in result:
+            score = priority(last_verified, confidence, now, npi in changed_npis, stale_after_days)
+            item = (score, pid, npi, last_updated, confidence)
+            # Bounded min-heap: O(n log size) instead of sorting every provider
+            if len(heap) < size:
+                heapq.heappush(heap, item)
+            elif score > heap[0][0]:
+                heapq.heapreplace(heap, item)
+
+    return sorted(heap, reverse=True)
+
+
+def directory_row(provider: Provider) -> dict:
+    """Rebuild the directory-side CSV row that gets compared against NPPES."""
+    from prevalidate import find_column
+
+    raw = provider.raw_data_json
+    # Reuse the stored row only if it came from a validator CSV (short or long
+    # headers); extractor profile dumps are rebuilt from the columns instead
+    if isinstance(raw, dict) and find_column(raw, "last_name"):
+        return {k: v for k, v in raw.items() if not k.startswith(RESULT_PREFIXES)}
+
+    is_org = bool(provider.practice_name) and not provider.first_name
+    return {
+        "npi": provider.npi,
+        "lname": provider.practice_name if is_org else provider.last_name,
+        "fname": "" if is_org else provider.first_name,
+        "etype": "O" if is_org else "I",
+        "addr1": provider.address_line1,
+        "city": provider.city,
+        "zip": provider.postal_code,
+        "state": provider.state,
+        "country": provider.country,
+        "ptype": (provider.specialties or [""])[0],
+    }
+
+
+async def run_reverification(
+    max_llm_calls: int = 100,
+    max_npi_calls: int = 1000,
+    npi_calls_per_sec: float = 5.0,
+    changed_npis: set[str] | None = None,
+    stale_after_days: int = STALE_AFTER_DAYS,
+    skip_llm_min_confidence: float = SKIP_LLM_MIN_CONFIDENCE,
+    dry_run: bool = False,
+) -> dict:
+    """
+    Re-verify the highest-priority providers within a budget.
+
+    Each candidate costs one NPPES lookup. Gemini is only called when NPPES
+    reports a change since the last pass, or the stored confidence is below
+    skip_llm_min_confidence; otherwise only last_verified is refreshed.
+    Stops at max_llm_calls Gemini calls or max_npi_calls lookups.
+    """
+    add_repo_dir("Validation")
+    add_repo_dir("Agents")  # gemini_compare calls through llm_gateway
+    from NPI import lookup_npi, NpiLookupError
+    from Validate import annotate_row
+
+    queue = await build_queue(max_npi_calls, changed_npis, stale_after_days)
+    print(f"Re-verification queue: {len(queue)} candidates (top score {queue[0][0]:.2f})" if queue
+          else "Re-verification queue is empty")
+    if dry_run:
+        return {"queued": len(queue), "npi_calls": 0, "llm_calls": 0, "refreshed": 0, "errors": 0}
+
+    async with AsyncSessionLocal() as session:
+        providers = {
+            p.provider_id: p
+            for p in await session.scalars(
+                select(Provider).where(Provider.provider_id.in_([q[1] for q in queue]))
+            )
+        }
+
+    start = time.perf_counter()
+    npi_calls = llm_calls = errors = 0
+    revalidated_rows = []
+    refreshed = {}  # provider_id -> current NPPES last_updated
+
+    for score, pid, npi, stored_last_updated, confidence in queue:
+        if llm_calls >= max_llm_calls:
+            break
+
+        try:
+            npi_info = await asyncio.to_thread(lookup_npi, npi)
+        except NpiLookupError as e:
+            print(f"[WARN] NPPES lookup failed for {npi}: {e}")
+            errors += 1
+            continue
+        finally:
+            npi_calls += 1
+            await asyncio.sleep(1.0 / npi_calls_per_sec)  # be kind to NPPES API
+
+        current_last_updated = npi_info.get("last_updated") if npi_info else None
+        # No stored value yet means this pass records the baseline
+        nppes_changed = (
+            npi_info is None
+            or (stored_last_updated is not None and current_last_updated != stored_last_updated)
+            or npi in (changed_npis or ())
+        )
+
+        if not nppes_changed and (confidence or 0.0) >= skip_llm_min_confidence:
+            refreshed[pid] = current_last_updated
+            continue
+
+        row = directory_row(providers[pid])
+        ok = await asyncio.to_thread(annotate_row, row, npi_info, npi)
+        if npi_info:
+            llm_calls += 1
+        if not ok:
+            errors += 1
+            continue
+        revalidated_rows.append(row)
+        print(f"[{npi_calls}] Re-verified NPI={npi} (priority {score:.2f}, nppes_changed={nppes_changed})")
+
+    if revalidated_rows:
+        await bulk_upsert_providers(validation_row_to_provider_row(r) for r in revalidated_rows)
+
+    if refreshed:
+        now = datetime.utcnow()
+        async with AsyncSessionLocal() as session:
+            for pid, last_updated in refreshed.items():
+                await session.execute(
+                    update(Provider)
+                    .where(Provider.provider_id == pid)
+                    .values(last_verified=now, nppes_last_updated=last_updated)
+                )
+            await session.commit()
+
+    stats = {
+        "queued": len(queue),
+        "npi_calls": npi_calls,
+        "llm_calls": llm_calls,
+        "refreshed": len(refreshed),
+        "errors": errors,
+        "seconds": round(time.perf_counter() - start, 1),
+    }
+    print(f"✓ Re-verification done: {stats}")
+    return stats
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Re-verify the stalest / least confident providers")
+    parser.add_argument("--max-llm-calls", type=int, default=100)
+    parser.add_argument("--max-npi-calls", type=int, default=1000)
+    parser.add_argument("--npi-rate", type=float, default=5.0, help="NPPES calls per second")
+    parser.add_argument("--changed-npis", help="file with one changed NPI per line (e.g. from the NPPES weekly update)")
+    parser.add_argument("--dry-run", action="store_true", help="only build and report the queue")
+    args = parser.parse_args()
+
+    changed = None
+    if args.changed_npis:
+        with open(args.changed_npis, encoding="utf-8") as f:
+            changed = {line.strip() for line in f if line.strip()}
+
+    asyncio.run(run_reverification(
+        max_llm_calls=args.max_llm_calls,
+        max_npi_calls=args.max_npi_calls,
+        npi_calls_per_sec=args.npi_rate,
+        changed_npis=changed,
+        dry_run=args.dry_run,
+    ))
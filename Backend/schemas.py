@@ -0,0 +1,60 @@
+from typing import List, Literal, Optional
+from datetime import datetime
+from pydantic import BaseModel, ConfigDict
+
+
+class ProviderOut(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    provider_id: int
+    npi: Optional[str] = None
+    display_name: Optional[str] = None
+    first_name: Optional[str] = None
+    last_name: Optional[str] = None
+    taxonomy_code: Optional[str] = None
+    specialties: Optional[List[str]] = None
+    phone: Optional[str] = None
+    practice_name: Optional[str] = None
+    address_line1: Optional[str] = None
+    city: Optional[str] = None
+    state: Optional[str] = None
+    postal_code: Optional[str] = None
+    languages: Optional[List[str]] = None
+    accepting_new_patients: Optional[bool] = None
+    telehealth: Optional[bool] = None
+    status: Optional[str] = None
+    overall_confidence: Optional[float] = None
+    last_verified: Optional[datetime] = None
+
+
+class ProviderPage(BaseModel):
+    items: List[ProviderOut]
+    # Pass back as ?cursor= to get the next page; None when exhausted
+    next_cursor: Optional[int] = None
+
+
+class JobCreate(BaseModel):
+    kind: Literal["validate", "extract"]
+    # Paths are relative to Data/
+    input_path: Optional[str] = None          # validate: CSV to validate
+    input_paths: List[str] = []               # extract: PDFs / images
+    output_path: Optional[str] = None         # default: Data/jobs/<job_id>.csv|.parquet|.jsonl
+    output_format: Literal["csv", "parquet"] = "csv"  # validate only
+
+
+class JobOut(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    job_id: str
+    kind: str
+    status: str
+    rows_total: Optional[int] = None
+    rows_done: int = 0
+    error_count: int = 0
+    rows_per_sec: Optional[float] = None
+    eta_seconds: Optional[float] = None
+    output_path: Optional[str] = None
+    error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
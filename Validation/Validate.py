@@ -1,89 +1,205 @@
 # validate_csv.py
 import csv
 import time
-from NPI import lookup_npi
+import pandas as pd
+from NPI import lookup_npi, NpiLookupError
 from gemini_compare import compare_row_with_npi_gemini
+from row_projection import project_row, compact_json, PromptStats
+from taxonomy_index import get_taxonomy_index
+from prevalidate import iter_prevalidated_chunks, repeated_npis
+
+RESULT_FIELDS = [
+    "npi_lookup_success",
+    "npi_last_updated",
+    "taxonomy_specialty_match",
+    "gemini_overall_match",
+    "gemini_confidence",
+    "gemini_issues",
+    "gemini_name_match",
+    "gemini_address_match",
+    "gemini_phone_match",
+    "gemini_specialty_match",
+    "gemini_explanation",
+]
+
+def annotate_row(row: dict, npi_info: dict | None, label=None, stats: PromptStats | None = None) -> bool:
+    """
+    Fill the npi_lookup_* / gemini_* result columns on a CSV row in place,
+    calling Gemini only when the NPI lookup succeeded.
+    Returns False if the Gemini call failed.
+    """
+    # Default values
+    row["npi_lookup_success"] = bool(npi_info)
+    row["npi_last_updated"] = npi_info.get("last_updated", "") if npi_info else ""
+    # Deterministic NUCC crosswalk verdict, independent of the LLM
+    row["taxonomy_specialty_match"] = get_taxonomy_index().specialty_match(
+        project_row(row).get("specialty", ""),
+        npi_info.get("primary_taxonomy") if npi_info else None,
+    ) if npi_info else ""
+    row["gemini_overall_match"] = ""
+    row["gemini_confidence"] = ""
+    row["gemini_issues"] = ""
+    row["gemini_name_match"] = ""
+    row["gemini_address_match"] = ""
+    row["gemini_phone_match"] = ""
+    row["gemini_specialty_match"] = ""
+    row["gemini_explanation"] = ""
+
+    if npi_info:
+        try:
+            gemini_result = compare_row_with_npi_gemini(row, npi_info, stats=stats)
+
+            row["gemini_overall_match"] = gemini_result.get("overall_match", "")
+            row["gemini_confidence"] = gemini_result.get("confidence", "")
+            row["gemini_issues"] = ";".join(gemini_result.get("issues", []))
+
+            fields = gemini_result.get("fields", {})
+            row["gemini_name_match"] = fields.get("name", {}).get("match", "")
+            row["gemini_address_match"] = fields.get("address", {}).get("match", "")
+            row["gemini_phone_match"] = fields.get("phone", {}).get("match", "")
+            row["gemini_specialty_match"] = fields.get("specialty", {}).get("match", "")
+
+            # Truncate explanation so CSV doesn’t explode
+            explanation = gemini_result.get("explanation", "") or ""
+            row["gemini_explanation"] = explanation[:1000]
+
+        except Exception as e:
+            print(f"[WARN] Gemini compare failed on row {label}: {e}")
+            return False
+
+    return True
 
 def validate_csv_with_gemini(
     input_csv_path: str,
     output_csv_path: str,
     sleep_between_npi_calls: float = 0.2,
+    progress_callback=None,
+    explanation_compression: str | None = "zstd",
 ) -> None:
     """
     For each row in the input CSV:
-      1. Look up NPI from the registry.
-      2. Ask Gemini to compare the row with NPI data.
-      3. Write enriched row + Gemini result to output CSV.
+      1. Pre-validate it offline, chunk by chunk (see prevalidate.py).
+      2. Look up NPI from the registry.
+      3. Ask Gemini to compare the row with NPI data.
+      4. Write enriched row + Gemini result to output CSV.
+
+    Rows rejected by pre-validation (bad NPI check digit, ZIP or state) make
+    no network calls. A repeated NPI is looked up once; later rows reuse that
+    result, and the Gemini verdict too when their compared fields are identical.
+
+    An output path ending in .parquet is written as a directory of typed,
+    columnar part files instead (see parquet_output.py);
+    explanation_compression picks the codec for gemini_explanation there.
+
+    progress_callback, if given, is called as progress_callback(rows_done, errors)
+    after every row. CSV output is flushed per row and Parquet per completed
+    part file, so partial results survive.
     """
-
-    with open(input_csv_path, newline="", encoding="utf-8") as infile, \
-         open(output_csv_path, "w", newline="", encoding="utf-8") as outfile:
-
-        reader = csv.DictReader(infile)
-        base_fields = list(reader.fieldnames or [])
-
-        extra_fields = [
-            "npi_lookup_success",
-            "gemini_overall_match",
-            "gemini_confidence",
-            "gemini_issues",
-            "gemini_name_match",
-            "gemini_address_match",
-            "gemini_phone_match",
-            "gemini_specialty_match",
-            "gemini_explanation",
-        ]
-        fieldnames = base_fields + [f for f in extra_fields if f not in base_fields]
-
+    errors = 0
+    # Per call, so concurrent validation jobs don't mix their counters
+    prompt_stats = PromptStats()
+    counts = {"ok": 0, "duplicate": 0, "rejected": 0}
+
+    base_fields = list(pd.read_csv(input_csv_path, nrows=0).columns)
+    extra_fields = RESULT_FIELDS + ["prevalidation_status", "prevalidation_reasons"]
+    fieldnames = base_fields + [f for f in extra_fields if f not in base_fields]
+
+    # NPI -> rows still to come, and the first row's lookup / results for each
+    remaining = repeated_npis(input_csv_path)
+    collapsed = {}
+
+    if output_csv_path.endswith(".parquet"):
+        from parquet_output import ParquetResultWriter
+        outfile = None
+        writer = ParquetResultWriter(output_csv_path, fieldnames, explanation_compression=explanation_compression)
+    else:
+        outfile = open(output_csv_path, "w", newline="", encoding="utf-8")
         writer = csv.DictWriter(outfile, fieldnames=fieldnames)
-        writer.writeheader()
-
-        for i, row in enumerate(reader, start=1):
-            npi = (row.get("npi") or "").strip()
-            print(f"[{i}] Processing NPI={npi}...")
-
-            npi_info = lookup_npi(npi) if npi else None
-            time.sleep(sleep_between_npi_calls)  # be kind to NPPES API
-
-            # Default values
-            row["npi_lookup_success"] = bool(npi_info)
-            row["gemini_overall_match"] = ""
-            row["gemini_confidence"] = ""
-            row["gemini_issues"] = ""
-            row["gemini_name_match"] = ""
-            row["gemini_address_match"] = ""
-            row["gemini_phone_match"] = ""
-            row["gemini_specialty_match"] = ""
-            row["gemini_explanation"] = ""
-
-            if npi_info:
-                try:
-                    gemini_result = compare_row_with_npi_gemini(row, npi_info)
-
-                    row["gemini_overall_match"] = gemini_result.get("overall_match", "")
-                    row["gemini_confidence"] = gemini_result.get("confidence", "")
-                    row["gemini_issues"] = ";".join(gemini_result.get("issues", []))
-
-                    fields = gemini_result.get("fields", {})
-                    row["gemini_name_match"] = fields.get("name", {}).get("match", "")
-                    row["gemini_address_match"] = fields.get("address", {}).get("match", "")
-                    row["gemini_phone_match"] = fields.get("phone", {}).get("match", "")
-                    row["gemini_specialty_match"] = fields.get("specialty", {}).get("match", "")
-
-                    # Truncate explanation so CSV doesn’t explode
-                    explanation = gemini_result.get("explanation", "") or ""
-                    row["gemini_explanation"] = explanation[:1000]
-
-                except Exception as e:
-                    print(f"[WARN] Gemini compare failed on row {i}: {e}")
-
-            writer.writerow(row)
+    writer.writeheader()
+
+    try:
+        i = 0
+        for chunk in iter_prevalidated_chunks(input_csv_path):
+            for row in chunk.to_dict("records"):
+                i += 1
+                projected = project_row(row)
+                npi = projected.get("npi", "")
+                status = row["prevalidation_status"]
+                counts[status] += 1
+
+                if status == "rejected":
+                    print(f"[{i}] Skipping NPI={npi}: {row['prevalidation_reasons']}")
+                    annotate_row(row, None, label=i, stats=prompt_stats)
+                    row["npi_lookup_success"] = ""  # never looked up
+                elif status == "duplicate" and npi in collapsed:
+                    npi_info, lookup_failed, first_payload, first_results = collapsed[npi]
+                    if compact_json(projected) == first_payload:
+                        print(f"[{i}] Reusing result for NPI={npi}")
+                        row.update(first_results)
+                    else:
+                        print(f"[{i}] Processing NPI={npi} (cached lookup)...")
+                        if not annotate_row(row, npi_info, label=i, stats=prompt_stats):
+                            errors += 1
+                        if lookup_failed:
+                            row["npi_lookup_success"] = ""
+                else:
+                    print(f"[{i}] Processing NPI={npi}...")
+                    lookup_failed = False
+                    try:
+                        npi_info = lookup_npi(npi)
+                    except NpiLookupError as e:
+                        print(f"[WARN] NPI lookup failed on row {i}: {e}")
+                        npi_info = None
+                        lookup_failed = True
+                    time.sleep(sleep_between_npi_calls)  # be kind to NPPES API
+
+                    if not annotate_row(row, npi_info, label=i, stats=prompt_stats):
+                        errors += 1
+                    if lookup_failed:
+                        # Unknown, not "not found": don't let the loader reject this NPI
+                        row["npi_lookup_success"] = ""
+                        errors += 1
+                    if npi in remaining:
+                        collapsed[npi] = (
+                            npi_info, lookup_failed, compact_json(projected),
+                            {f: row[f] for f in RESULT_FIELDS},
+                        )
+
+                if npi in remaining:
+                    remaining[npi] -= 1
+                    if remaining[npi] <= 0:
+                        del remaining[npi]
+                        collapsed.pop(npi, None)
+
+                writer.writerow(row)
+                if outfile:
+                    outfile.flush()
+
+                if progress_callback:
+                    progress_callback(i, errors)
+    finally:
+        if outfile:
+            outfile.close()
+        else:
+            writer.close()
 
     print(f"✓ Done. Wrote validation results to {output_csv_path}")
+    print(f"Pre-validation: {counts}")
+    print(f"Prompt size: {prompt_stats.summary()}")
 
 if __name__ == "__main__":
-    validate_csv_with_gemini(
-        r"C:\Users\Dhile\Projects\Health Data Validation\EY\Data\clean_output.csv",
-        r"C:\Users\Dhile\Projects\Health Data Validation\EY\Data\validated_gemini.csv",
-    )
+    import os
+    import sys
+    import argparse
+    # Run directly: make the sibling Agents/ folder importable (cli.py does this for its commands)
+    sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Backend"))
+    from repo_paths import add_repo_dir
+    add_repo_dir("Agents")
+
+    parser = argparse.ArgumentParser(description="Validate a provider CSV against NPPES with Gemini")
+    parser.add_argument("input_csv")
+    parser.add_argument("output", help="output .csv or .parquet")
+    parser.add_argument("--sleep", type=float, default=0.2, help="seconds between NPPES calls")
+    args = parser.parse_args()
+    validate_csv_with_gemini(args.input_csv, args.output, sleep_between_npi_calls=args.sleep)
 
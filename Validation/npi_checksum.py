@@ -0,0 +1,21 @@
+# npi_checksum.py
+# Dependency-free. Agents/healthcare_schema.py keeps its own copy of the
+# check so the schema doesn't depend on Validation/ being importable.
+
+# NPIs are Luhn numbers under the "80840" health-industry card prefix; the
+# prefix's digits always add 24 to the checksum.
+NPI_PREFIX_SUM = 24
+
+
+def is_valid_npi(npi) -> bool:
+    """10 digits with a valid Luhn check digit under the 80840 prefix."""
+    npi = str(npi or "").strip()
+    if len(npi) != 10 or not npi.isdigit():
+        return False
+    total = NPI_PREFIX_SUM
+    for i, d in enumerate(int(c) for c in npi[:9]):
+        if i % 2 == 0:
+            d *= 2
+            d -= 9 if d > 9 else 0
+        total += d
+    return (10 - total % 10) % 10 == int(npi[9])
@@ -0,0 +1,240 @@
+# parquet_output.py
+import os
+import csv
+import glob
+import time
+import shutil
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+ROW_GROUP_SIZE = 5000
+
+BOOL_FIELDS = (
+    "npi_lookup_success",
+    "gemini_overall_match",
+    "gemini_name_match",
+    "gemini_address_match",
+    "gemini_phone_match",
+    "gemini_specialty_match",
+)
+FLOAT_FIELDS = ("gemini_confidence",)
+LIST_FIELDS = ("gemini_issues",)  # ";"-joined in CSV, list<string> here
+
+
+def _to_bool(value):
+    if value is None or value == "":
+        return None
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in ("true", "1", "yes")
+
+
+def _to_float(value):
+    if value is None or value == "":
+        return None
+    return float(value)
+
+
+def _to_list(value):
+    if value is None or value == "":
+        return []
+    if isinstance(value, list):
+        return value
+    return [v for v in str(value).split(";") if v]
+
+
+def _to_str(value):
+    if value is None or value == "":
+        return None
+    return str(value)
+
+
+def result_schema(fieldnames: list[str]) -> pa.Schema:
+    """Typed schema for validate_csv_with_gemini output columns; input columns stay strings."""
+    fields = []
+    for name in fieldnames:
+        if name in BOOL_FIELDS:
+            fields.append(pa.field(name, pa.bool_()))
+        elif name in FLOAT_FIELDS:
+            fields.append(pa.field(name, pa.float32()))
+        elif name in LIST_FIELDS:
+            fields.append(pa.field(name, pa.list_(pa.string())))
+        else:
+            fields.append(pa.field(name, pa.string()))
+    return pa.schema(fields)
+
+
+def _leaf_path(field: pa.Field) -> str:
+    # Per-column writer options are keyed by Parquet leaf path, not top-level name
+    if pa.types.is_list(field.type):
+        return f"{field.name}.list.element"
+    return field.name
+
+
+def _converter(field: pa.Field):
+    if pa.types.is_boolean(field.type):
+        return _to_bool
+    if pa.types.is_floating(field.type):
+        return _to_float
+    if pa.types.is_list(field.type):
+        return _to_list
+    return _to_str
+
+
+class ParquetResultWriter:
+    """
+    Drop-in for csv.DictWriter in validate_csv_with_gemini: buffers rows and
+    writes every row_group_size rows as its own complete file,
+    <path>/part-00000.parquet, part-00001.parquet, ... A single Parquet file
+    is unreadable until its footer is written on close, so this is what lets
+    a killed or interrupted run keep the parts it finished.
+
+    explanation_compression: codec for gemini_explanation ("zstd", "snappy",
+    "gzip", or None for uncompressed); other columns use snappy. issues and
+    the low-cardinality string columns are dictionary-encoded.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        fieldnames: list[str],
+        row_group_size: int = ROW_GROUP_SIZE,
+        explanation_compression: str | None = "zstd",
+    ):
+        self.path = path
+        self.schema = result_schema(fieldnames)
+        self.converters = [(f.name, _converter(f)) for f in self.schema]
+        self.row_group_size = row_group_size
+        self.buffer = {name: [] for name, _ in self.converters}
+        self.buffered = 0
+        self.parts = 0
+
+        compression = {_leaf_path(f): "snappy" for f in self.schema}
+        if "gemini_explanation" in compression:
+            compression["gemini_explanation"] = explanation_compression or "none"
+        self.write_options = {
+            "compression": compression,
+            # Long free text gains nothing from a dictionary; everything else does
+            "use_dictionary": [_leaf_path(f) for f in self.schema if f.name != "gemini_explanation"],
+        }
+
+        os.makedirs(path, exist_ok=True)
+        # A rerun into the same directory replaces the earlier parts
+        for old in glob.glob(os.path.join(path, "part-*.parquet")):
+            os.remove(old)
+
+    def writeheader(self) -> None:
+        pass  # every part file carries the schema
+
+    def writerow(self, row: dict) -> None:
+        for name, convert in self.converters:
+            self.buffer[name].append(convert(row.get(name)))
+        self.buffered += 1
+        if self.buffered >= self.row_group_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self.buffered:
+            return
+        self._write_part(pa.Table.from_pydict(self.buffer, schema=self.schema))
+        self.buffer = {name: [] for name, _ in self.converters}
+        self.buffered = 0
+
+    def _write_part(self, table: pa.Table) -> None:
+        name = f"part-{self.parts:05d}.parquet"
+        # Dot-prefixed names are skipped by readers, so a half-written part never shows up
+        tmp = os.path.join(self.path, f".{name}.tmp")
+        pq.write_table(table, tmp, row_group_size=self.row_group_size, **self.write_options)
+        os.replace(tmp, os.path.join(self.path, name))
+        self.parts += 1
+
+    def close(self) -> None:
+        self.flush()
+        if not self.parts:
+            # Keep the schema readable for a run with no rows
+            self._write_part(self.schema.empty_table())
+
+
+def read_validation_results(path: str, columns: list[str] | None = None):
+    """
+    Load validation output into a DataFrame, reading only `columns` if given.
+    Parquet output (a directory of part files, or a single file) reads just
+    those column chunks; CSV falls back to usecols.
+    """
+    if path.endswith(".parquet"):
+        return pq.read_table(path, columns=columns).to_pandas()
+
+    import pandas as pd
+    return pd.read_csv(path, usecols=columns, dtype=str, keep_default_na=False)
+
+
+def _size_bytes(path: str) -> int:
+    if os.path.isdir(path):
+        return sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+    return os.path.getsize(path)
+
+
+def compare_formats(csv_path: str, repeat: int = 1000, columns: list[str] | None = None) -> dict:
+    """
+    Write an existing validation CSV (rows repeated `repeat` times) as CSV and
+    Parquet, then report file size, write time and reload time for each.
+    """
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        fieldnames = list(reader.fieldnames or [])
+        rows = list(reader)
+    rows = rows * repeat
+    columns = columns or [c for c in ("gemini_overall_match", "gemini_confidence", "gemini_issues") if c in fieldnames]
+
+    base = os.path.splitext(csv_path)[0] + "_bench"
+    out = {}
+    for fmt in ("csv", "parquet"):
+        path = f"{base}.{fmt}"
+        start = time.perf_counter()
+        if fmt == "csv":
+            with open(path, "w", newline="", encoding="utf-8") as f:
+                writer = csv.DictWriter(f, fieldnames=fieldnames)
+                writer.writeheader()
+                writer.writerows(rows)
+        else:
+            writer = ParquetResultWriter(path, fieldnames)
+            for row in rows:
+                writer.writerow(row)
+            writer.close()
+        write_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        read_validation_results(path)
+        read_all_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        read_validation_results(path, columns=columns)
+        read_cols_s = time.perf_counter() - start
+
+        out[fmt] = {
+            "rows": len(rows),
+            "size_mb": round(_size_bytes(path) / 1e6, 2),
+            "write_s": round(write_s, 3),
+            "reload_all_s": round(read_all_s, 3),
+            "reload_selected_s": round(read_cols_s, 3),
+        }
+        if fmt == "csv":
+            os.remove(path)
+        else:
+            shutil.rmtree(path)
+
+    print(f"CSV vs Parquet ({len(rows)} rows, selected columns {columns}):")
+    for fmt, stats in out.items():
+        print(f"  {fmt:8} {stats}")
+    return out
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Compare CSV and Parquet validation output")
+    parser.add_argument("csv_path", help="an existing validate_csv_with_gemini output CSV")
+    parser.add_argument("--repeat", type=int, default=1000, help="repeat rows to simulate a large run")
+    args = parser.parse_args()
+    compare_formats(args.csv_path, args.repeat)
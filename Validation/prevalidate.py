@@ -0,0 +1,166 @@
+# prevalidate.py
+import numpy as np
+import pandas as pd
+
+from npi_checksum import NPI_PREFIX_SUM
+from row_projection import SOURCE_FIELDS, clean_zip
+
+CHUNK_SIZE = 10000
+
+US_STATE_CODES = frozenset("""
+AL AK AZ AR CA CO CT DE DC FL GA HI ID IL IN IA KS KY LA ME MD MA MI MN MS MO
+MT NE NV NH NJ NM NY NC ND OH OK OR PA RI SC SD TN TX UT VT VA WA WV WI WY
+AS GU MP PR VI AA AE AP
+""".split())
+
+# Reasons that keep a row away from NPPES / Gemini. Anything else is only a note.
+REJECT_REASONS = ("invalid_npi", "invalid_zip", "invalid_state")
+
+
+def find_column(columns, field: str) -> str | None:
+    """First input header (short or long layout) that carries `field`."""
+    for header in SOURCE_FIELDS[field]:
+        if header in columns:
+            return header
+    return None
+
+
+def _strip_float(values: pd.Series) -> pd.Series:
+    # pandas round-trips turn numeric columns into floats: "1234567893.0"
+    return values.fillna("").astype(str).str.strip().str.replace(r"\.0$", "", regex=True)
+
+
+def npi_checksum_ok(npis: pd.Series) -> np.ndarray:
+    """Vectorized NPI check: 10 digits and a valid Luhn digit with the 80840 prefix."""
+    npis = npis.fillna("").astype(str)
+    well_formed = npis.str.fullmatch(r"[0-9]{10}").to_numpy(dtype=bool)
+    ok = np.zeros(len(npis), dtype=bool)
+    if not well_formed.any():
+        return ok
+
+    digits = np.frombuffer("".join(npis[well_formed]).encode("ascii"), dtype=np.uint8)
+    digits = digits.reshape(-1, 10).astype(np.int32) - ord("0")
+    # Double every other digit starting from the one left of the check digit
+    doubled = digits[:, 0:9:2] * 2
+    doubled -= np.where(doubled > 9, 9, 0)
+    total = NPI_PREFIX_SUM + doubled.sum(axis=1) + digits[:, 1:9:2].sum(axis=1)
+    ok[well_formed] = (10 - total % 10) % 10 == digits[:, 9]
+    return ok
+
+
+def normalize_zip(zips: pd.Series) -> tuple[pd.Series, np.ndarray]:
+    """
+    row_projection.clean_zip, applied once per distinct value.
+    Returns (normalized, valid); empty values count as valid.
+    """
+    zips = zips.fillna("").astype(str)
+    zips = zips.map({z: clean_zip(z) or "" for z in zips.unique()})
+    valid = (zips == "") | zips.str.fullmatch(r"[0-9]{5}|[0-9]{9}")
+    return zips, valid.to_numpy(dtype=bool)
+
+
+def normalize_state(states: pd.Series) -> tuple[pd.Series, np.ndarray]:
+    states = states.fillna("").astype(str).str.strip().str.upper()
+    valid = (states == "") | states.isin(US_STATE_CODES)
+    return states, valid.to_numpy(dtype=bool)
+
+
+def normalize_phone(phones: pd.Series) -> tuple[pd.Series, np.ndarray]:
+    """10-digit NANP numbers; a leading country code 1 is dropped."""
+    phones = _strip_float(phones).str.replace(r"\D", "", regex=True)
+    phones = phones.where(~((phones.str.len() == 11) & phones.str.startswith("1")), phones.str[1:])
+    valid = (phones == "") | (phones.str.len() == 10)
+    return phones, valid.to_numpy(dtype=bool)
+
+
+def prevalidate_frame(df: pd.DataFrame, seen_npis: set | None = None) -> pd.DataFrame:
+    """
+    Validate and normalize one chunk of input rows in place, adding:
+      prevalidation_status  - "ok", "rejected" (see REJECT_REASONS) or
+                              "duplicate" (NPI already sent downstream,
+                              here or in an earlier chunk via seen_npis)
+      prevalidation_reasons - ";"-joined reasons, including notes like
+                              invalid_phone that don't reject the row
+    Valid ZIP / state / phone values are written back normalized.
+    """
+    flags = {}
+    npi_col = find_column(df.columns, "npi")
+    if npi_col:
+        npis = _strip_float(df[npi_col])
+        df[npi_col] = npis
+        flags["invalid_npi"] = ~npi_checksum_ok(npis)
+    else:
+        npis = pd.Series("", index=df.index)
+        flags["invalid_npi"] = np.ones(len(df), dtype=bool)
+
+    for field, normalize, reason in (
+        ("postal_code", normalize_zip, "invalid_zip"),
+        ("state", normalize_state, "invalid_state"),
+        ("phone", normalize_phone, "invalid_phone"),
+    ):
+        col = find_column(df.columns, field)
+        if col is None:
+            continue
+        normalized, valid = normalize(df[col])
+        df[col] = normalized.where(valid, df[col])
+        flags[reason] = ~valid
+
+    rejected = np.zeros(len(df), dtype=bool)
+    for reason in REJECT_REASONS:
+        rejected |= flags.get(reason, False)
+    # Collapse repeat NPIs among the rows that would otherwise go downstream;
+    # a rejected row doesn't count, so the first row actually sent stays "ok"
+    duplicate = ~rejected & npis.where(~rejected).duplicated().to_numpy(dtype=bool)
+    if seen_npis is not None:
+        duplicate |= ~rejected & npis.isin(seen_npis).to_numpy(dtype=bool)
+        seen_npis.update(npis[~rejected & ~duplicate])
+
+    reasons = pd.Series("", index=df.index)
+    for reason, mask in flags.items():
+        reasons = reasons.where(~mask, reasons + ";" + reason)
+    df["prevalidation_status"] = np.where(rejected, "rejected", np.where(duplicate, "duplicate", "ok"))
+    df["prevalidation_reasons"] = reasons.str.lstrip(";")
+    return df
+
+
+def repeated_npis(input_csv_path: str, chunksize: int = CHUNK_SIZE) -> dict:
+    """NPI -> row count for NPIs that appear more than once in the file (reads only the NPI column)."""
+    header = pd.read_csv(input_csv_path, nrows=0).columns
+    npi_col = find_column(header, "npi")
+    if npi_col is None:
+        return {}
+    counts = pd.Series(dtype="int64")
+    for chunk in pd.read_csv(input_csv_path, usecols=[npi_col], dtype=str, keep_default_na=False, chunksize=chunksize):
+        counts = counts.add(_strip_float(chunk[npi_col]).value_counts(), fill_value=0)
+    return {npi: int(n) for npi, n in counts[counts > 1].items()}
+
+
+def iter_prevalidated_chunks(input_csv_path: str, chunksize: int = CHUNK_SIZE):
+    """Yield prevalidated DataFrame chunks of the input CSV, all values as strings."""
+    seen_npis = set()
+    for chunk in pd.read_csv(input_csv_path, dtype=str, keep_default_na=False, chunksize=chunksize):
+        yield prevalidate_frame(chunk, seen_npis)
+
+
+if __name__ == "__main__":
+    import time
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Pre-validate a provider CSV without any network calls")
+    parser.add_argument("input_csv")
+    parser.add_argument("--chunksize", type=int, default=CHUNK_SIZE)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    counts = {"ok": 0, "rejected": 0, "duplicate": 0}
+    reasons = {}
+    for chunk in iter_prevalidated_chunks(args.input_csv, args.chunksize):
+        for status, n in chunk["prevalidation_status"].value_counts().items():
+            counts[status] += int(n)
+        for value in chunk["prevalidation_reasons"]:
+            for reason in filter(None, value.split(";")):
+                reasons[reason] = reasons.get(reason, 0) + 1
+    elapsed = time.perf_counter() - start
+    total = sum(counts.values())
+    print(f"{total} rows in {elapsed:.2f}s ({total / elapsed if elapsed else 0:.0f} rows/s): {counts}")
+    print(f"Reasons: {reasons}")
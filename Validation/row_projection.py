@@ -0,0 +1,136 @@
+# row_projection.py
+import json
+import threading
+
+# Canonical field -> source headers it can come from, in priority order.
+# Covers the short layout (npi,lname,fname,...) and the long Medicare layout
+# ("National Provider Identifier",...). The one header mapping for the
+# prompt, pre-validation and bulk_loader.
+SOURCE_FIELDS = {
+    "npi": ("npi", "National Provider Identifier"),
+    "last_name": ("lname", "Last Name/Organization Name of the Provider"),
+    "first_name": ("fname", "First Name of the Provider"),
+    "middle_initial": ("m_initial", "Middle Initial of the Provider"),
+    "credential": ("cred", "Credentials of the Provider"),
+    "entity_type": ("etype", "Entity Type of the Provider"),
+    "address_1": ("addr1", "Street Address 1 of the Provider"),
+    "address_2": ("addr2", "Street Address 2 of the Provider"),
+    "city": ("city", "City of the Provider"),
+    "state": ("state", "State Code of the Provider"),
+    "postal_code": ("zip", "Zip Code of the Provider"),
+    "phone": ("phone", "telephone_number"),
+    "specialty": ("ptype", "Provider Type"),
+    "country": ("country", "Country Code of the Provider"),
+}
+
+# The fields Gemini compares. Anything else (country, HCPCS codes, service
+# counts, payment amounts, earlier gemini_* results) never reaches the prompt.
+COMPARISON_FIELDS = {field: headers for field, headers in SOURCE_FIELDS.items() if field != "country"}
+
+# Subset of the normalized lookup_npi() address / taxonomy the model needs
+NPI_ADDRESS_FIELDS = ("address_1", "address_2", "city", "state", "postal_code", "telephone_number")
+NPI_TAXONOMY_FIELDS = ("code", "desc", "primary")
+
+
+def clean_value(value) -> str | None:
+    if value is None:
+        return None
+    value = str(value).strip()
+    return value or None
+
+
+def clean_zip(value) -> str | None:
+    """
+    ZIP5 / ZIP9 digits ("63104-1004", "631041004.0" -> "631041004"). A pandas
+    float round-trip also drops leading zeros, so 4 / 8 digit values are
+    re-padded. Anything else is returned stripped but otherwise as is.
+    """
+    value = clean_value(value)
+    if value is None:
+        return None
+    if value.endswith(".0"):
+        value = value[:-2]
+    digits = value.replace("-", "").replace(" ", "")
+    if not digits.isdigit():
+        return value
+    if len(digits) in (4, 8):
+        digits = digits.zfill(len(digits) + 1)
+    return digits
+
+
+def project_row(row: dict, fields: dict = COMPARISON_FIELDS) -> dict:
+    """
+    Map a CSV row (either layout) to canonical fields, empty ones dropped.
+    By default the minimal comparison payload; pass SOURCE_FIELDS for all.
+    """
+    out = {}
+    for field, headers in fields.items():
+        for header in headers:
+            value = clean_value(row.get(header))
+            if value is not None:
+                out[field] = clean_zip(value) if field == "postal_code" else value
+                break
+    return out
+
+
+def project_npi_info(npi_info: dict) -> dict:
+    """Minimal NPI registry payload: name, primary practice address, primary taxonomy."""
+    address = npi_info.get("primary_practice_address") or {}
+    taxonomy = npi_info.get("primary_taxonomy") or {}
+    out = {
+        "npi": npi_info.get("npi"),
+        "first_name": npi_info.get("first_name"),
+        "last_name": npi_info.get("last_name"),
+        "primary_practice_address": {k: address.get(k) for k in NPI_ADDRESS_FIELDS if address.get(k)},
+        "primary_taxonomy": {k: taxonomy.get(k) for k in NPI_TAXONOMY_FIELDS if taxonomy.get(k) is not None},
+    }
+    return {k: v for k, v in out.items() if v}
+
+
+def compact_json(obj) -> str:
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False)
+
+
+def estimate_tokens(text: str) -> int:
+    # ~4 characters per token for English/JSON; only used when the API gives no usage
+    return (len(text) + 3) // 4
+
+
+class PromptStats:
+    """Per-run prompt size counters, shared across threads."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        self.prompts = 0
+        self.baseline_tokens = 0   # estimate for the old json.dumps(row, indent=2) prompt
+        self.estimated_tokens = 0  # estimate for the prompt actually sent
+        self.prompt_tokens = 0     # as reported by the API
+        self.reported = 0
+
+    def record(self, baseline_text: str, prompt: str, reported_tokens: int | None = None) -> None:
+        with self.lock:
+            self.prompts += 1
+            self.baseline_tokens += estimate_tokens(baseline_text)
+            self.estimated_tokens += estimate_tokens(prompt)
+            if reported_tokens:
+                self.prompt_tokens += reported_tokens
+                self.reported += 1
+
+    def summary(self) -> dict:
+        with self.lock:
+            if not self.prompts:
+                return {"prompts": 0}
+            saved = 1 - self.estimated_tokens / self.baseline_tokens if self.baseline_tokens else 0.0
+            return {
+                "prompts": self.prompts,
+                "avg_prompt_tokens_est": round(self.estimated_tokens / self.prompts, 1),
+                "avg_prompt_tokens_reported": round(self.prompt_tokens / self.reported, 1) if self.reported else None,
+                "avg_baseline_tokens_est": round(self.baseline_tokens / self.prompts, 1),
+                "estimated_savings": f"{saved:.0%}",
+            }
+
+
+prompt_stats = PromptStats()
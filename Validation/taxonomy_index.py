@@ -0,0 +1,262 @@
+# taxonomy_index.py
+import io
+import os
+import re
+import csv
+import json
+import time
+
+INDEX_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "nucc_taxonomy.json")
+
+TAXONOMY_CODE_RE = re.compile(r"^[0-9]{3}[0-9A-Z]{6}X$")
+
+# The full NUCC code set has ~870 codes; fewer means a partial index
+# (e.g. a hand-made subset) that leaves common NPPES codes unresolved.
+MIN_COMPLETE_CODES = 800
+
+# Directory / CMS "Provider Type" names that don't literally match a NUCC
+# classification or specialization. Merged into the index at build time.
+SPECIALTY_ALIASES = {
+    "Family Practice": ["207Q00000X"],
+    "Cardiology": ["207RC0000X", "207RI0011X", "207RC0001X"],
+    "Interventional Cardiology": ["207RI0011X"],
+    "Cardiac Electrophysiology": ["207RC0001X"],
+    "Endocrinology": ["207RE0101X"],
+    "Hematology-Oncology": ["207RH0003X"],
+    "Hematology/Oncology": ["207RH0003X"],
+    "Oncology": ["207RX0202X", "207RH0003X"],
+    "Critical Care (Intensivists)": ["207RC0200X"],
+    "Hospice and Palliative Care": ["207RH0002X"],
+    "Pulmonology": ["207RP1001X"],
+    "Obstetrics/Gynecology": ["207V00000X"],
+    "OB/GYN": ["207V00000X"],
+    "Gynecological Oncology": ["207VX0201X"],
+    "Pediatric Medicine": ["208000000X"],
+    "Pain Management": ["207LP2900X"],
+    "Interventional Pain Management": ["207LP2900X"],
+    "Interventional Radiology": ["2085R0204X"],
+    "General Surgery": ["208600000X"],
+    "Orthopedic Surgery": ["207X00000X"],
+    "Colorectal Surgery (Proctology)": ["208C00000X"],
+    "Cardiac Surgery": ["208G00000X"],
+    "Thoracic Surgery": ["208G00000X"],
+    "Neurosurgery": ["207T00000X"],
+    "Physical Medicine and Rehabilitation": ["208100000X"],
+    "Allergy/Immunology": ["207K00000X"],
+    "Certified Registered Nurse Anesthetist (CRNA)": ["367500000X"],
+    "CRNA": ["367500000X"],
+    "Optometry": ["152W00000X"],
+    "Chiropractic": ["111N00000X"],
+    "Podiatry": ["213E00000X"],
+    "Physical Therapist in Private Practice": ["225100000X"],
+    "Occupational Therapist in Private Practice": ["225X00000X"],
+    "Psychologist, Clinical": ["103T00000X"],
+    "Licensed Clinical Social Worker": ["1041C0700X"],
+    "Speech Language Pathologist": ["235Z00000X"],
+    "Registered Dietitian/Nutrition Professional": ["133V00000X"],
+    "Clinical Laboratory": ["291U00000X"],
+}
+
+
+def normalize_specialty(name: str) -> str:
+    """'Obstetrics & Gynecology' -> 'obstetrics and gynecology'."""
+    name = (name or "").lower().replace("&", " and ")
+    name = re.sub(r"[^a-z0-9]+", " ", name)
+    return " ".join(name.split())
+
+
+def _read_nucc_csv(nucc_csv_path: str) -> list[dict]:
+    # Accepts a local path or the http(s) URL of the CSV on nucc.org.
+    # Some NUCC releases are Windows-1252 rather than UTF-8.
+    if nucc_csv_path.startswith(("http://", "https://")):
+        from urllib.request import urlopen
+        with urlopen(nucc_csv_path, timeout=60) as resp:
+            raw = resp.read()
+    else:
+        with open(nucc_csv_path, "rb") as f:
+            raw = f.read()
+    try:
+        text = raw.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        text = raw.decode("cp1252")
+    return list(csv.DictReader(io.StringIO(text, newline="")))
+
+
+def build_index(nucc_csv_path: str, out_path: str = INDEX_PATH) -> dict:
+    """
+    Build the compact JSON index from a NUCC taxonomy CSV
+    (Code,Grouping,Classification,Specialization,...,Display Name,...),
+    given as a path or URL.
+    """
+    groupings = []
+    codes = {}
+    for rec in _read_nucc_csv(nucc_csv_path):
+        code = rec["Code"].strip()
+        grouping = rec["Grouping"].strip()
+        if grouping not in groupings:
+            groupings.append(grouping)
+        codes[code] = [
+            groupings.index(grouping),
+            rec["Classification"].strip(),
+            (rec.get("Specialization") or "").strip(),
+            (rec.get("Display Name") or "").strip(),
+        ]
+
+    aliases = {}
+
+    def add(name, code_list):
+        key = normalize_specialty(name)
+        if key:
+            aliases.setdefault(key, set()).update(code_list)
+
+    base_code = {c[1]: code for code, c in codes.items() if not c[2]}
+    by_classification = {}
+    by_specialization = {}
+    for code, (_, classification, specialization, display) in codes.items():
+        by_classification.setdefault(classification, []).append(code)
+        if specialization:
+            by_specialization.setdefault(specialization, []).append(code)
+            add(f"{classification} {specialization}", [code])
+        if display:
+            add(display, [code])
+
+    for classification, members in by_classification.items():
+        # The bare classification means its generalist code when there is one
+        add(classification, [base_code[classification]] if classification in base_code else members)
+    for specialization, members in by_specialization.items():
+        add(specialization, members)
+    for name, code_list in SPECIALTY_ALIASES.items():
+        add(name, [c for c in code_list if c in codes])
+
+    index = {
+        "source": os.path.basename(nucc_csv_path),
+        "groupings": groupings,
+        # code -> [grouping index, classification, specialization]
+        "codes": {code: c[:3] for code, c in codes.items()},
+        "aliases": {k: sorted(v) for k, v in sorted(aliases.items())},
+    }
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump(index, f, separators=(",", ":"))
+    print(f"✓ Wrote {len(codes)} codes / {len(aliases)} aliases to {out_path}")
+    if len(codes) < MIN_COMPLETE_CODES:
+        print(f"[WARN] Only {len(codes)} codes; the full NUCC set has ~870. Is this the complete CSV?")
+    return index
+
+
+class TaxonomyIndex:
+    """In-memory NUCC crosswalk with O(1) code and specialty-name lookups."""
+
+    def __init__(self, data: dict):
+        self.groupings = data["groupings"]
+        self.codes = data["codes"]
+        self.aliases = {k: frozenset(v) for k, v in data["aliases"].items()}
+        self.by_classification = {}
+        for code, (_, classification, _) in self.codes.items():
+            self.by_classification.setdefault(classification, set()).add(code)
+        self.classification_keys = {normalize_specialty(c): c for c in self.by_classification}
+        self.source = data.get("source")
+        self.complete = len(self.codes) >= MIN_COMPLETE_CODES
+
+    @classmethod
+    def load(cls, path: str = INDEX_PATH) -> "TaxonomyIndex":
+        with open(path, encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def lookup(self, code: str) -> dict | None:
+        entry = self.codes.get((code or "").strip().upper())
+        if entry is None:
+            return None
+        grouping, classification, specialization = entry
+        return {
+            "code": code.strip().upper(),
+            "grouping": self.groupings[grouping],
+            "classification": classification,
+            "specialization": specialization or None,
+        }
+
+    def resolve(self, specialty: str) -> frozenset:
+        """Taxonomy codes for a code or a specialty name; empty if unknown."""
+        value = (specialty or "").strip()
+        if TAXONOMY_CODE_RE.match(value.upper()) and value.upper() in self.codes:
+            return frozenset([value.upper()])
+        return self.aliases.get(normalize_specialty(value), frozenset())
+
+    def classifications(self, codes) -> set:
+        return {self.codes[c][1] for c in codes if c in self.codes}
+
+    def classification_of(self, desc: str) -> str | None:
+        """
+        Known classification an NPPES taxonomy desc ("Classification,
+        Specialization") starts with. Classifications can contain commas
+        themselves ("Dietitian, Registered"), so the longest prefix wins.
+        """
+        parts = (desc or "").split(",")
+        for i in range(len(parts), 0, -1):
+            classification = self.classification_keys.get(normalize_specialty(",".join(parts[:i])))
+            if classification:
+                return classification
+        return None
+
+    def specialty_match(self, directory_specialty: str, npi_taxonomy: dict | None) -> str:
+        """
+        Deterministic verdict for a directory specialty vs. an NPPES taxonomy
+        ({"code": ..., "desc": ...}):
+          "match"    - same taxonomy code
+          "related"  - same NUCC classification (e.g. Internal Medicine vs. Cardiovascular Disease)
+          "mismatch" - both resolved, nothing in common
+          "unknown"  - either side could not be resolved
+        An NPPES code missing from the index is compared by the classification
+        its desc names, so it can come out "related" or "mismatch" but never "match".
+        """
+        directory_codes = self.resolve(directory_specialty)
+        npi_taxonomy = npi_taxonomy or {}
+        npi_codes = self.resolve(npi_taxonomy.get("code") or "") or self.resolve(npi_taxonomy.get("desc") or "")
+        if directory_codes and not npi_codes:
+            classification = self.classification_of(npi_taxonomy.get("desc"))
+            if classification:
+                return "related" if classification in self.classifications(directory_codes) else "mismatch"
+        if not directory_codes or not npi_codes:
+            return "unknown"
+        if directory_codes & npi_codes:
+            return "match"
+        if self.classifications(directory_codes) & self.classifications(npi_codes):
+            return "related"
+        return "mismatch"
+
+
+_index = None
+
+
+def get_taxonomy_index() -> TaxonomyIndex:
+    """Shared index, loaded on first use."""
+    global _index
+    if _index is None:
+        _index = TaxonomyIndex.load()
+        if not _index.complete:
+            print(f"[WARN] Taxonomy index {_index.source} has only {len(_index.codes)} codes; NPPES codes "
+                  f"outside it compare as \"unknown\". Rebuild with taxonomy_index.py --build <NUCC CSV>.")
+    return _index
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build or inspect the NUCC taxonomy index")
+    parser.add_argument("--build", metavar="NUCC_CSV",
+                        help="rebuild nucc_taxonomy.json from the NUCC taxonomy CSV (path or nucc.org URL)")
+    parser.add_argument("--check", action="store_true", help="exit non-zero unless the bundled index is complete")
+    parser.add_argument("lookup", nargs="*", help="codes or specialty names to resolve")
+    args = parser.parse_args()
+
+    if args.build:
+        build_index(args.build)
+
+    start = time.perf_counter()
+    index = TaxonomyIndex.load()
+    print(f"Loaded {len(index.codes)} codes from {index.source} in {(time.perf_counter() - start) * 1000:.2f} ms")
+    if args.check and not index.complete:
+        raise SystemExit(f"✗ {index.source} has {len(index.codes)} codes, fewer than {MIN_COMPLETE_CODES}: "
+                         f"rebuild from the official NUCC CSV")
+    for value in args.lookup:
+        codes = index.resolve(value)
+        print(f"{value!r}: {[index.lookup(c) for c in sorted(codes)]}")
@@ -0,0 +1,247 @@
+# cli.py
+"""
+Single entry point for the provider data tools:
+
+    python cli.py validate Data/clean_output.csv Data/validated_gemini.csv
+    python cli.py extract Data/license.pdf
+    python cli.py enrich --first-name SATYASREE --last-name UPADHYAYULA --npi 1891106191
+    python cli.py network --specialty Cardiology
+    python cli.py bench startup
+
+Only argparse is imported up front. Each subcommand imports its subsystem
+(pandas, Gemini, langchain, selenium, ...) when it runs, so --help and the
+light commands start fast; `bench startup` checks that they stay that way.
+"""
+import os
+import sys
+import argparse
+
+REPO_ROOT = os.path.dirname(os.path.abspath(__file__))
+STARTUP_BUDGET_MS = 300
+
+# The sibling script folders are made importable with Backend/repo_paths.py
+sys.path.append(os.path.join(REPO_ROOT, "Backend"))
+from repo_paths import add_repo_dir  # noqa: E402
+
+
+def cmd_validate(args) -> None:
+    add_repo_dir("Validation")
+    add_repo_dir("Agents")  # gemini_compare calls through llm_gateway
+    if args.prevalidate_only:
+        from prevalidate import iter_prevalidated_chunks
+
+        counts = {"ok": 0, "rejected": 0, "duplicate": 0}
+        for chunk in iter_prevalidated_chunks(args.input_csv):
+            for status, n in chunk["prevalidation_status"].value_counts().items():
+                counts[status] += int(n)
+        print(f"Pre-validation: {counts}")
+        return
+
+    if not args.output:
+        sys.exit("validate: an output path is required unless --prevalidate-only is given")
+    from Validate import validate_csv_with_gemini
+
+    validate_csv_with_gemini(
+        args.input_csv,
+        args.output,
+        sleep_between_npi_calls=args.sleep,
+        explanation_compression=None if args.compression == "none" else args.compression,
+    )
+
+
+def cmd_extract(args) -> None:
+    add_repo_dir("Agents")
+    import json
+    from extractor_agent import HealthcareExtractionModel
+
+    extractor = HealthcareExtractionModel()
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        for path in args.paths:
+            profile = extractor.extract_provider_data(extractor.load_content(path))
+            out.write(json.dumps({
+                "source": path,
+                "profile": profile.model_dump(mode="json") if profile else None,
+            }) + "\n")
+    finally:
+        if args.output:
+            out.close()
+
+
+def cmd_enrich(args) -> None:
+    add_repo_dir("Agents")
+    import json
+    from enrichment_agent import EnrichmentManager, cleanup_driver
+
+    if args.profile:
+        with open(args.profile, encoding="utf-8") as f:
+            profile = json.load(f)
+    else:
+        profile = {}
+    for key in ("first_name", "last_name", "credential", "city", "state", "npi"):
+        if getattr(args, key) is not None:
+            profile[key] = getattr(args, key)
+
+    try:
+        print(EnrichmentManager().enrich_profile(partial_profile=profile, missing_keys=args.missing))
+    finally:
+        cleanup_driver()
+
+
+def cmd_network(args) -> None:
+    add_repo_dir("Agents")
+    add_repo_dir("Validation")  # taxonomy_index
+    if args.capacity_aware and not args.specialty:
+        # Unassigned members for every specialty members need
+        import json
+        from network_agent import capacity_gap_report
+        print(json.dumps(capacity_gap_report(args.radius), indent=2))
+    elif args.specialty:
+        # Direct geospatial check, no LLM
+        from network_agent import analyze_specialty_gaps
+        print(analyze_specialty_gaps(args.specialty, args.radius, capacity_aware=args.capacity_aware))
+    else:
+        from network_agent import ReActNetworkGapAgent
+        ReActNetworkGapAgent().run(args.query)
+
+
+def bench_startup(args) -> None:
+    """Time fresh interpreters running `cli.py --help` and the light commands."""
+    import time
+    import subprocess
+
+    commands = [["--help"], ["validate", "--help"], ["bench", "--help"]]
+    worst = 0.0
+    for command in commands:
+        timings = []
+        for _ in range(args.runs):
+            start = time.perf_counter()
+            subprocess.run([sys.executable, __file__, *command], check=True, stdout=subprocess.DEVNULL)
+            timings.append((time.perf_counter() - start) * 1000)
+        best = min(timings)
+        worst = max(worst, best)
+        print(f"  cli.py {' '.join(command):18} {best:7.1f} ms (best of {args.runs})")
+
+    if worst > args.budget_ms:
+        sys.exit(f"✗ Startup {worst:.1f} ms exceeds the {args.budget_ms} ms budget")
+    print(f"✓ Startup within {args.budget_ms} ms")
+
+
+def bench_gateway(args) -> None:
+    add_repo_dir("Agents")
+    from llm_gateway import simulate, simulate_quota
+    simulate(args.calls, args.capacity, args.clients, check=args.check)
+    simulate_quota(check=args.check)
+    if args.check:
+        print("✓ Gateway within simulation bounds")
+
+
+def bench_prevalidate(args) -> None:
+    add_repo_dir("Validation")
+    import time
+    from prevalidate import iter_prevalidated_chunks
+
+    start = time.perf_counter()
+    rows = sum(len(chunk) for chunk in iter_prevalidated_chunks(args.input_csv))
+    elapsed = time.perf_counter() - start
+    print(f"{rows} rows pre-validated in {elapsed:.2f}s ({rows / elapsed if elapsed else 0:.0f} rows/s)")
+
+
+def bench_parquet(args) -> None:
+    add_repo_dir("Validation")
+    from parquet_output import compare_formats
+    compare_formats(args.csv_path, args.repeat)
+
+
+def bench_dedupe(args) -> None:
+    from dedupe_providers import benchmark
+    benchmark(tuple(args.sizes))
+
+
+def bench_network(args) -> None:
+    add_repo_dir("Agents")
+    from network_assignment import benchmark
+    benchmark(tuple(args.sizes), max_distance_miles=args.radius)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="cli.py", description="Provider directory validation tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("validate", help="validate a provider CSV against NPPES with Gemini")
+    p.add_argument("input_csv")
+    p.add_argument("output", nargs="?", help="output .csv, or a .parquet directory of part files")
+    p.add_argument("--sleep", type=float, default=0.2, help="seconds between NPPES calls")
+    p.add_argument("--compression", default="zstd", choices=["zstd", "snappy", "gzip", "none"],
+                   help="Parquet codec for gemini_explanation")
+    p.add_argument("--prevalidate-only", action="store_true", help="only run the offline pre-validation pass")
+    p.set_defaults(func=cmd_validate)
+
+    p = sub.add_parser("extract", help="extract provider profiles from PDFs / images")
+    p.add_argument("paths", nargs="+")
+    p.add_argument("-o", "--output", help="JSON lines output file (default: stdout)")
+    p.set_defaults(func=cmd_extract)
+
+    p = sub.add_parser("enrich", help="fill missing profile fields from the web")
+    p.add_argument("--profile", help="JSON file with the partial profile")
+    p.add_argument("--first-name", dest="first_name")
+    p.add_argument("--last-name", dest="last_name")
+    p.add_argument("--credential")
+    p.add_argument("--city")
+    p.add_argument("--state")
+    p.add_argument("--npi")
+    p.add_argument("--missing", nargs="+", default=["phone", "practice_address", "fax"])
+    p.set_defaults(func=cmd_enrich)
+
+    p = sub.add_parser("network", help="network adequacy analysis")
+    p.add_argument("query", nargs="?", default="Analyze the network for Cardiology gaps. Are our members covered?",
+                   help="question for the ReAct agent")
+    p.add_argument("--specialty", help="run the gap analysis for this specialty directly, without the LLM")
+    p.add_argument("--radius", type=float, default=15.0, help="max distance in miles")
+    p.add_argument("--capacity-aware", action="store_true",
+                   help="assign members to providers within panel capacity (all specialties unless --specialty)")
+    p.set_defaults(func=cmd_network)
+
+    p = sub.add_parser("bench", help="benchmarks")
+    bench = p.add_subparsers(dest="bench", required=True)
+
+    b = bench.add_parser("startup", help="check CLI startup time")
+    b.add_argument("--runs", type=int, default=5)
+    b.add_argument("--budget-ms", type=float, default=STARTUP_BUDGET_MS)
+    b.set_defaults(func=bench_startup)
+
+    b = bench.add_parser("gateway", help="LLM gateway against a rate-limited fake backend")
+    b.add_argument("--calls", type=int, default=2000)
+    b.add_argument("--capacity", type=int, default=12)
+    b.add_argument("--clients", type=int, default=64)
+    b.add_argument("--no-check", dest="check", action="store_false", help="report only, don't enforce the bounds")
+    b.set_defaults(func=bench_gateway)
+
+    b = bench.add_parser("prevalidate", help="pre-validation throughput on a CSV")
+    b.add_argument("input_csv")
+    b.set_defaults(func=bench_prevalidate)
+
+    b = bench.add_parser("parquet", help="CSV vs Parquet output size and reload time")
+    b.add_argument("csv_path")
+    b.add_argument("--repeat", type=int, default=1000)
+    b.set_defaults(func=bench_parquet)
+
+    b = bench.add_parser("dedupe", help="duplicate detection scaling on synthetic data")
+    b.add_argument("--sizes", type=int, nargs="+", default=[25_000, 50_000, 100_000, 200_000])
+    b.set_defaults(func=bench_dedupe)
+
+    b = bench.add_parser("network", help="capacity-aware member assignment scaling on synthetic data")
+    b.add_argument("--sizes", type=int, nargs="+", default=[10_000, 50_000, 200_000])
+    b.add_argument("--radius", type=float, default=5.0)
+    b.set_defaults(func=bench_network)
+
+    return parser
+
+
+def main(argv=None) -> None:
+    args = build_parser().parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
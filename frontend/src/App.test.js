@@ -1,8 +1,15 @@
 import { render, screen } from '@testing-library/react';
 import App from './App';
 
-test('renders learn react link', () => {
+beforeEach(() => {
+  global.fetch = jest.fn(() =>
+    Promise.resolve({ ok: true, json: () => Promise.resolve([]) })
+  );
+});
+
+test('renders the validation jobs panel', async () => {
   render(<App />);
-  const linkElement = screen.getByText(/learn react/i);
-  expect(linkElement).toBeInTheDocument();
+  expect(screen.getByText(/provider directory validation/i)).toBeInTheDocument();
+  expect(await screen.findByText(/start validation/i)).toBeInTheDocument();
+  expect(global.fetch).toHaveBeenCalledWith(expect.stringMatching(/\/jobs$/));
 });
@@ -0,0 +1,133 @@
+import { useCallback, useEffect, useState } from 'react';
+
+const API_URL = process.env.REACT_APP_API_URL || 'http://localhost:8000';
+const TERMINAL_STATUSES = ['succeeded', 'failed', 'interrupted'];
+
+function formatEta(seconds) {
+  if (seconds === null || seconds === undefined) return '–';
+  const s = Math.round(seconds);
+  const m = Math.floor(s / 60);
+  return m > 0 ? `${m}m ${s % 60}s` : `${s}s`;
+}
+
+function JobRow({ job }) {
+  const [live, setLive] = useState(job);
+
+  useEffect(() => {
+    setLive(job);
+  }, [job]);
+
+  useEffect(() => {
+    if (job.status !== 'queued' && job.status !== 'running') return undefined;
+    // EventSource reconnects on its own whenever the stream ends, including
+    // when the server finishes it, so close it once the job is done
+    const source = new EventSource(`${API_URL}/jobs/${job.job_id}/events`);
+    source.onmessage = (event) => {
+      const data = JSON.parse(event.data);
+      setLive(data);
+      if (TERMINAL_STATUSES.includes(data.status)) source.close();
+    };
+    source.addEventListener('end', () => source.close());
+    source.addEventListener('error', (event) => {
+      // event.data is set for the server's own `event: error` (unknown job)
+      if (event.data || source.readyState === EventSource.CLOSED) source.close();
+    });
+    return () => source.close();
+  }, [job.job_id, job.status]);
+
+  const total = live.rows_total || 0;
+  const pct = total ? Math.min(100, Math.round((live.rows_done / total) * 100)) : 0;
+
+  return (
+    <tr>
+      <td title={live.job_id}>{live.job_id.slice(0, 8)}</td>
+      <td>{live.kind}</td>
+      <td className={`Job-status Job-status-${live.status}`}>{live.status}</td>
+      <td>
+        <progress max="100" value={pct} /> {live.rows_done}/{total || '?'}
+      </td>
+      <td>{live.rows_per_sec ? live.rows_per_sec.toFixed(1) : '–'}</td>
+      <td>{formatEta(live.eta_seconds)}</td>
+      <td>{live.error_count}</td>
+      <td>{live.error || ''}</td>
+    </tr>
+  );
+}
+
+function JobsPanel() {
+  const [jobs, setJobs] = useState([]);
+  const [inputPath, setInputPath] = useState('');
+  const [message, setMessage] = useState('');
+
+  const loadJobs = useCallback(
+    () =>
+      fetch(`${API_URL}/jobs`)
+        .then((res) => res.json())
+        .then(setJobs)
+        .catch(() => setMessage('Could not reach the API')),
+    []
+  );
+
+  useEffect(() => {
+    loadJobs();
+  }, [loadJobs]);
+
+  const startJob = (event) => {
+    event.preventDefault();
+    fetch(`${API_URL}/jobs`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({ kind: 'validate', input_path: inputPath }),
+    })
+      .then(async (res) => {
+        const body = await res.json();
+        if (!res.ok) throw new Error(body.detail || res.statusText);
+        setMessage(`Started job ${body.job_id}`);
+        setJobs((prev) => [body, ...prev]);
+      })
+      .catch((err) => setMessage(`Failed to start job: ${err.message}`));
+  };
+
+  return (
+    <section className="JobsPanel">
+      <h2>Validation jobs</h2>
+      <form onSubmit={startJob}>
+        <label>
+          Input CSV (relative to Data/){' '}
+          <input
+            value={inputPath}
+            onChange={(e) => setInputPath(e.target.value)}
+            placeholder="clean_output.csv"
+            required
+          />
+        </label>{' '}
+        <button type="submit">Start validation</button>{' '}
+        <button type="button" onClick={loadJobs}>
+          Refresh
+        </button>
+      </form>
+      {message && <p className="JobsPanel-message">{message}</p>}
+      <table>
+        <thead>
+          <tr>
+            <th>Job</th>
+            <th>Kind</th>
+            <th>Status</th>
+            <th>Progress</th>
+            <th>Rows/sec</th>
+            <th>ETA</th>
+            <th>Errors</th>
+            <th>Detail</th>
+          </tr>
+        </thead>
+        <tbody>
+          {jobs.map((job) => (
+            <JobRow key={job.job_id} job={job} />
+          ))}
+        </tbody>
+      </table>
+    </section>
+  );
+}
+
+export default JobsPanel;